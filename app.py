@@ -12,6 +12,9 @@ import os
 import re
 import zipfile
 import io
+import gzip
+import zlib
+import hashlib
 from functools import wraps
 from urllib.parse import unquote
 
@@ -20,14 +23,23 @@ from flask import (
     session, redirect, url_for, Response, stream_with_context,
 )
 from config import Config
+from assets import AssetManifest
+from exports import PENDING_FILENAME, find_pending_html, parse_pending_html
+from watcher import get_watcher, start_watcher
+from tracing import Tracer, NULL_TRACER
+from ledger import ledger
 from instagram_api import (
     InstagramAPI, InstagramAPIError,
     RateLimitError, AuthenticationError,
+    inflight, lookup_endpoint_stats,
 )
 
 app = Flask(__name__)
 app.config.from_object(Config)
 
+# Fingerprinted + precompressed copies of everything under static/
+assets = AssetManifest(app.static_folder)
+
 # In-memory store for active tasks (auto-cleaned after 10 min)
 cancel_tasks = {}
 
@@ -44,6 +56,122 @@ def _cleanup_old_tasks():
 _cleanup_old_tasks()
 
 
+# ------------------------------------------------------------------
+# Response helpers (compact JSON, ETag, compression, SSE framing)
+# ------------------------------------------------------------------
+
+_json_encoder = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False, check_circular=False)
+
+
+def _dumps(obj):
+    return _json_encoder.encode(obj)
+
+
+def _negotiate_encoding():
+    """Pick gzip or deflate from the client's Accept-Encoding, or None."""
+    accepted = request.accept_encodings
+    for encoding in ("gzip", "deflate"):
+        if accepted[encoding]:
+            return encoding
+    return None
+
+
+def json_response(payload, status=200):
+    """
+    JSON response for large list payloads.
+    Sets a content-hash ETag, answers If-None-Match with 304 and
+    compresses the body when the client supports it. The ETag is weak
+    because the gzip, deflate and identity bodies all share it.
+    """
+    body = _dumps(payload).encode("utf-8")
+    etag = hashlib.sha1(body).hexdigest()
+
+    if status == 200 and request.if_none_match.contains_weak(etag):
+        resp = Response(status=304)
+        resp.set_etag(etag, weak=True)
+        resp.headers["Vary"] = "Accept-Encoding"
+        return resp
+
+    headers = {"Vary": "Accept-Encoding", "Cache-Control": "private, no-cache"}
+    encoding = _negotiate_encoding() if len(body) >= Config.COMPRESS_MIN_SIZE else None
+    if encoding == "gzip":
+        body = gzip.compress(body, compresslevel=Config.COMPRESS_LEVEL)
+        headers["Content-Encoding"] = "gzip"
+    elif encoding == "deflate":
+        body = zlib.compress(body, Config.COMPRESS_LEVEL)
+        headers["Content-Encoding"] = "deflate"
+
+    resp = Response(body, status=status, mimetype="application/json", headers=headers)
+    if status == 200:
+        resp.set_etag(etag, weak=True)
+    return resp
+
+
+def sse_event(payload):
+    return f"data: {_dumps(payload)}\n\n"
+
+
+def sse_response(events, tracer=NULL_TRACER):
+    """
+    Stream server-sent events, compressed when the client allows it.
+    Each event is sync-flushed so it reaches the browser immediately while
+    still sharing the compression window with earlier events.
+    With a tracer, the time spent handing each chunk to the server is
+    recorded as an sse_flush span.
+    """
+    encoding = _negotiate_encoding()
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no", "Connection": "keep-alive"}
+
+    if encoding:
+        wbits = 31 if encoding == "gzip" else 15
+        headers["Content-Encoding"] = encoding
+        headers["Vary"] = "Accept-Encoding"
+
+        def compressed():
+            compressor = zlib.compressobj(Config.COMPRESS_LEVEL, zlib.DEFLATED, wbits)
+            for event in events:
+                yield compressor.compress(event.encode("utf-8")) + compressor.flush(zlib.Z_SYNC_FLUSH)
+            yield compressor.flush()
+
+        body = compressed()
+    else:
+        body = events
+
+    if tracer is not NULL_TRACER:
+        body = _traced_stream(body, tracer)
+
+    return Response(stream_with_context(body), mimetype="text/event-stream", headers=headers)
+
+
+def _traced_stream(chunks, tracer):
+    # The generator is suspended at yield while the server writes the chunk
+    for chunk in chunks:
+        start = time.perf_counter()
+        yield chunk
+        tracer.add("sse_flush", "sse", start, time.perf_counter(), {"bytes": len(chunk)})
+
+
+def _task_tracer(task_id, requested):
+    """A Tracer when tracing was asked for (or is on globally), else NULL_TRACER."""
+    if requested or Config.TRACE_TASKS:
+        return Tracer(task_id)
+    return NULL_TRACER
+
+
+@app.template_global()
+def asset_url(filename):
+    """Template helper: content-hashed URL for a file under static/."""
+    return assets.url(filename)
+
+
+@app.route("/assets/<path:filename>")
+def fingerprinted_asset(filename):
+    resp = assets.response(filename)
+    if resp is None:
+        return "", 404
+    return resp
+
+
 # ------------------------------------------------------------------
 # Auth helper
 # ------------------------------------------------------------------
@@ -141,40 +269,19 @@ def api_extract_zip():
     try:
         zip_bytes = io.BytesIO(uploaded.read())
         with zipfile.ZipFile(zip_bytes, "r") as zf:
-            # Find any file matching pending_follow_requests.html
-            target = None
-            for name in zf.namelist():
-                if name.endswith("pending_follow_requests.html"):
-                    target = name
-                    break
-
+            target = find_pending_html(zf)
             if not target:
                 # List what's in the zip for debugging
                 html_files = [n for n in zf.namelist() if n.endswith(".html")]
                 return jsonify({
-                    "error": f"Could not find pending_follow_requests.html in the zip. Found {len(html_files)} HTML files.",
+                    "error": f"Could not find {PENDING_FILENAME} in the zip. Found {len(html_files)} HTML files.",
                     "html_files": html_files[:20],
                 }), 400
 
             html = zf.read(target).decode("utf-8", errors="ignore")
-            usernames = []
-            username_dates = {}
-            # Try to extract username + date pairs
-            pairs = re.findall(
-                r'href="https://www\.instagram\.com/([^"/?]+)"[^<]*</a></div>\s*<div>([^<]+)</div>',
-                html,
-            )
-            if pairs:
-                for uname, date_str in pairs:
-                    if uname not in usernames:
-                        usernames.append(uname)
-                        username_dates[uname] = date_str.strip()
-            else:
-                for match in re.findall(r'href="https://www\.instagram\.com/([^"/?]+)"', html):
-                    if match not in usernames:
-                        usernames.append(match)
-
-            return jsonify({"usernames": usernames, "dates": username_dates, "count": len(usernames), "file": target})
+            usernames, username_dates = parse_pending_html(html)
+
+            return json_response({"usernames": usernames, "dates": username_dates, "count": len(usernames), "file": target})
 
     except zipfile.BadZipFile:
         return jsonify({"error": "Not a valid zip file."}), 400
@@ -199,21 +306,7 @@ def api_pending_sent():
         uploaded = request.files.get("export_file")
         if uploaded and uploaded.filename:
             html = uploaded.read().decode("utf-8", errors="ignore")
-            # Try to extract username + date pairs first
-            pairs = re.findall(
-                r'href="https://www\.instagram\.com/([^"/?]+)"[^<]*</a></div>\s*<div>([^<]+)</div>',
-                html,
-            )
-            if pairs:
-                for uname, date_str in pairs:
-                    if uname not in usernames:
-                        usernames.append(uname)
-                        username_dates[uname] = date_str.strip()
-            else:
-                # Fallback: just usernames
-                for match in re.findall(r'href="https://www\.instagram\.com/([^"/?]+)"', html):
-                    if match not in usernames:
-                        usernames.append(match)
+            usernames, username_dates = parse_pending_html(html)
         raw = request.form.get("usernames", "")
         if raw:
             for u in re.split(r'[\n,\s]+', raw):
@@ -231,15 +324,27 @@ def api_pending_sent():
     if not usernames:
         return jsonify({"error": "No usernames provided."}), 400
 
+    # Skip accounts already settled in earlier runs (?include_settled=1 to re-check them)
+    skipped = []
+    if request.args.get("include_settled") != "1":
+        usernames, skipped = ledger.triage(session["ig_ds_user_id"], usernames, username_dates)
+        if not usernames:
+            return jsonify({
+                "error": f"All {len(skipped)} usernames were already settled in earlier runs.",
+                "skipped": len(skipped),
+            }), 400
+
     # Store usernames and dates in session for the SSE stream to pick up
     task_id = f"sent_{session['ig_ds_user_id']}_{int(time.time())}"
     cancel_tasks[task_id] = {
+        "account": session["ig_ds_user_id"],
         "usernames": usernames,
         "username_dates": username_dates,
         "status": "pending",
+        "tracer": _task_tracer(task_id, request.args.get("trace") == "1"),
     }
 
-    return jsonify({"task_id": task_id, "total": len(usernames)})
+    return jsonify({"task_id": task_id, "total": len(usernames), "skipped": len(skipped)})
 
 
 @app.route("/api/check-sent/<task_id>")
@@ -252,6 +357,7 @@ def api_check_sent(task_id):
 
     usernames = task["usernames"]
     username_dates = task.get("username_dates", {})
+    tracer = task.get("tracer", NULL_TRACER)
     cookies = {
         "session_id": session["ig_session_id"],
         "ds_user_id": session["ig_ds_user_id"],
@@ -260,58 +366,41 @@ def api_check_sent(task_id):
 
     def generate():
         api = InstagramAPI(cookies["session_id"], cookies["ds_user_id"], cookies["csrf_token"])
+        api.tracer = tracer
+        account = cookies["ds_user_id"]
         total = len(usernames)
 
         for i, username in enumerate(usernames):
+            tracer.set_context(username=username, index=i)
             user_data = {"username": username, "index": i, "total": total}
             # Include date from data export if available
             if username in username_dates:
                 user_data["request_date"] = username_dates[username]
 
             try:
-                user = api.get_user_by_username(username)
-                if user:
-                    try:
-                        status = api.check_friendship(user["user_id"])
-                        if status and status.get("outgoing_request"):
-                            user["status"] = "pending"
-                        elif status and status.get("following"):
-                            user["status"] = "accepted"
-                        else:
-                            user["status"] = "not_pending"
-                    except Exception:
-                        user["status"] = "unknown"
-                    user_data.update(user)
-                else:
-                    user_data.update({
-                        "user_id": None, "full_name": "", "profile_pic_url": "",
-                        "is_private": False, "is_verified": False, "status": "not_found",
-                    })
+                user_data.update(api.check_outgoing_status(username))
+                ledger.record(account, user_data["status"], username=username, user_id=user_data.get("user_id"))
             except RateLimitError:
                 user_data["status"] = "rate_limited"
-                yield f"data: {json.dumps(user_data)}\n\n"
-                yield f"data: {json.dumps({'type': 'complete', 'reason': 'rate_limited'})}\n\n"
+                yield sse_event(user_data)
+                yield sse_event({'type': 'complete', 'reason': 'rate_limited'})
                 return
             except AuthenticationError:
                 user_data["status"] = "auth_error"
-                yield f"data: {json.dumps(user_data)}\n\n"
-                yield f"data: {json.dumps({'type': 'complete', 'reason': 'auth_error'})}\n\n"
+                yield sse_event(user_data)
+                yield sse_event({'type': 'complete', 'reason': 'auth_error'})
                 return
             except Exception as e:
                 user_data["status"] = "error"
 
-            yield f"data: {json.dumps(user_data)}\n\n"
+            yield sse_event(user_data)
 
             if i < total - 1:
-                time.sleep(Config.FETCH_PAGE_DELAY)
+                tracer.sleep(Config.FETCH_PAGE_DELAY, "pacing")
 
-        yield f"data: {json.dumps({'type': 'complete', 'reason': 'done'})}\n\n"
+        yield sse_event({'type': 'complete', 'reason': 'done'})
 
-    return Response(
-        stream_with_context(generate()),
-        mimetype="text/event-stream",
-        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", "Connection": "keep-alive"},
-    )
+    return sse_response(generate(), tracer)
 
 
 @app.route("/api/cancel-all-sent/<task_id>")
@@ -324,6 +413,7 @@ def api_cancel_all_sent(task_id):
 
     usernames = task["usernames"]
     username_dates = task.get("username_dates", {})
+    tracer = task.get("tracer", NULL_TRACER)
     cookies = {
         "session_id": session["ig_session_id"],
         "ds_user_id": session["ig_ds_user_id"],
@@ -332,41 +422,36 @@ def api_cancel_all_sent(task_id):
 
     def generate():
         api = InstagramAPI(cookies["session_id"], cookies["ds_user_id"], cookies["csrf_token"])
+        api.tracer = tracer
+        account = cookies["ds_user_id"]
         total = len(usernames)
         succeeded = 0
         failed = 0
         skipped = 0
 
         for i, username in enumerate(usernames):
+            tracer.set_context(username=username, index=i)
             result = {"username": username, "index": i, "total": total}
             if username in username_dates:
                 result["request_date"] = username_dates[username]
 
             try:
-                user = api.get_user_by_username(username)
-                if user and user.get("user_id"):
-                    result["user_id"] = user["user_id"]
-                    result["profile_pic_url"] = user.get("profile_pic_url", "")
-                    result["full_name"] = user.get("full_name", "")
-                    try:
-                        api.cancel_follow_request(user["user_id"])
-                        result["status"] = "cancelled"
-                        succeeded += 1
-                    except Exception as e:
-                        result["status"] = "cancel_failed"
-                        result["error"] = str(e)
-                        failed += 1
-                else:
-                    result["status"] = "not_found"
+                result.update(api.cancel_outgoing_by_username(username))
+                ledger.record(account, result["status"], username=username, user_id=result.get("user_id"))
+                if result["status"] == "cancelled":
+                    succeeded += 1
+                elif result["status"] == "not_found":
                     skipped += 1
+                else:
+                    failed += 1
             except RateLimitError:
                 result["status"] = "rate_limited"
                 failed += 1
                 result["succeeded"] = succeeded
                 result["failed"] = failed
                 result["skipped"] = skipped
-                yield f"data: {json.dumps(result)}\n\n"
-                yield f"data: {json.dumps({'type': 'complete', 'reason': 'rate_limited', 'succeeded': succeeded, 'failed': failed, 'skipped': skipped})}\n\n"
+                yield sse_event(result)
+                yield sse_event({'type': 'complete', 'reason': 'rate_limited', 'succeeded': succeeded, 'failed': failed, 'skipped': skipped})
                 return
             except AuthenticationError:
                 result["status"] = "auth_error"
@@ -374,8 +459,8 @@ def api_cancel_all_sent(task_id):
                 result["succeeded"] = succeeded
                 result["failed"] = failed
                 result["skipped"] = skipped
-                yield f"data: {json.dumps(result)}\n\n"
-                yield f"data: {json.dumps({'type': 'complete', 'reason': 'auth_error', 'succeeded': succeeded, 'failed': failed, 'skipped': skipped})}\n\n"
+                yield sse_event(result)
+                yield sse_event({'type': 'complete', 'reason': 'auth_error', 'succeeded': succeeded, 'failed': failed, 'skipped': skipped})
                 return
             except Exception:
                 result["status"] = "error"
@@ -384,43 +469,77 @@ def api_cancel_all_sent(task_id):
             result["succeeded"] = succeeded
             result["failed"] = failed
             result["skipped"] = skipped
-            yield f"data: {json.dumps(result)}\n\n"
+            yield sse_event(result)
 
             if i < total - 1:
-                time.sleep(random.uniform(Config.CANCEL_DELAY_MIN, Config.CANCEL_DELAY_MAX))
+                tracer.sleep(random.uniform(Config.CANCEL_DELAY_MIN, Config.CANCEL_DELAY_MAX), "pacing")
 
-        yield f"data: {json.dumps({'type': 'complete', 'reason': 'done', 'succeeded': succeeded, 'failed': failed, 'skipped': skipped})}\n\n"
+        yield sse_event({'type': 'complete', 'reason': 'done', 'succeeded': succeeded, 'failed': failed, 'skipped': skipped})
 
-    return Response(
-        stream_with_context(generate()),
-        mimetype="text/event-stream",
-        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", "Connection": "keep-alive"},
-    )
+    return sse_response(generate(), tracer)
 
 
 @app.route("/api/pending-received")
 @login_required
 def api_pending_received():
-    """Fetch incoming pending requests — people who requested to follow YOU."""
-    try:
-        api = get_ig_api()
-        users = api.get_incoming_pending_requests()
-        return jsonify({"users": users, "count": len(users)})
-    except AuthenticationError as e:
-        session.clear()
-        return jsonify({"error": str(e), "auth_expired": True}), 401
-    except RateLimitError as e:
-        return jsonify({"error": str(e)}), 429
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+    """
+    Fetch incoming pending requests — people who requested to follow YOU.
+    Served from this worker's watcher when one is running; otherwise the
+    list is fetched once and used to seed a new watcher. The returned
+    cursor is passed to /api/pending-received/changes.
+    """
+    account = session["ig_ds_user_id"]
+    watcher = get_watcher(account)
+    if watcher is None:
+        try:
+            api = get_ig_api()
+            users = inflight.do((account, "get_incoming_pending_requests"), api.get_incoming_pending_requests)
+        except AuthenticationError as e:
+            session.clear()
+            return jsonify({"error": str(e), "auth_expired": True}), 401
+        except RateLimitError as e:
+            return jsonify({"error": str(e)}), 429
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+        cookies = {
+            "session_id": session["ig_session_id"],
+            "ds_user_id": account,
+            "csrf_token": session["ig_csrf_token"],
+        }
+        watcher = start_watcher(account, cookies, users)
+
+    users, cursor = watcher.snapshot()
+    return json_response({"users": users, "count": len(users), "cursor": cursor,
+                          "poll_after": Config.WATCH_POLL_INTERVAL})
+
+
+@app.route("/api/pending-received/changes")
+@login_required
+def api_pending_received_changes():
+    """
+    Added users and removed ids since ?cursor=, polled by the Received tab.
+    Answered from memory, so a poll never waits on Instagram. A worker
+    without a watcher for the account says so and leaves the cursor as-is;
+    the client only reloads after several such answers in a row.
+    """
+    watcher = get_watcher(session["ig_ds_user_id"])
+    if watcher is None:
+        return jsonify({"type": "unwatched", "cursor": request.args.get("cursor"),
+                        "poll_after": Config.WATCH_POLL_INTERVAL})
+    result = watcher.changes_since(request.args.get("cursor"))
+    result["poll_after"] = Config.WATCH_POLL_INTERVAL
+    return json_response(result)
 
 
 @app.route("/api/not-following-back")
 @login_required
 def api_not_following_back():
     try:
-        users = get_ig_api().get_not_following_back()
-        return jsonify({"users": users, "count": len(users)})
+        users = inflight.do(
+            (session["ig_ds_user_id"], "get_not_following_back"),
+            get_ig_api().get_not_following_back,
+        )
+        return json_response({"users": users, "count": len(users)})
     except AuthenticationError as e:
         session.clear()
         return jsonify({"error": str(e), "auth_expired": True}), 401
@@ -455,6 +574,9 @@ def _start_batch(data, action_type):
 
     task_id = f"{action_type}_{session['ig_ds_user_id']}_{int(time.time())}"
     cancel_tasks[task_id] = {
+        "account": session["ig_ds_user_id"],
+        "action": action_type,
+        "source": data.get("source"),  # tab that started it; only "sent" cancels are outgoing
         "status": "running",
         "total": len(user_ids),
         "completed": 0,
@@ -462,6 +584,7 @@ def _start_batch(data, action_type):
         "failed": 0,
         "results": [],
         "queue": queue.Queue(),
+        "tracer": _task_tracer(task_id, bool(data.get("trace"))),
     }
 
     cookies = {
@@ -478,14 +601,20 @@ def _start_batch(data, action_type):
 
 def _run_batch(task_id, user_ids, cookies):
     task = cancel_tasks[task_id]
+    tracer = task["tracer"]
     api = InstagramAPI(cookies["session_id"], cookies["ds_user_id"], cookies["csrf_token"])
+    api.tracer = tracer
 
     for i, uid in enumerate(user_ids):
+        tracer.set_context(user_id=uid, index=i)
         result = {"user_id": uid, "index": i}
         try:
             api.cancel_follow_request(uid)
             result["status"] = "cancelled"
             task["succeeded"] += 1
+            # Declines from the Received tab also go through /api/cancel
+            if task["action"] == "cancel" and task["source"] == "sent":
+                ledger.record(cookies["ds_user_id"], "cancelled", user_id=uid)
         except RateLimitError:
             result["status"] = "rate_limited"
             task["failed"] += 1
@@ -514,7 +643,7 @@ def _run_batch(task_id, user_ids, cookies):
         task["queue"].put(result)
 
         if i < len(user_ids) - 1:
-            time.sleep(random.uniform(Config.CANCEL_DELAY_MIN, Config.CANCEL_DELAY_MAX))
+            tracer.sleep(random.uniform(Config.CANCEL_DELAY_MIN, Config.CANCEL_DELAY_MAX), "pacing")
 
     task["status"] = "completed"
     task["queue"].put(None)
@@ -536,19 +665,33 @@ def api_progress(task_id):
             try:
                 result = task["queue"].get(timeout=60)
             except queue.Empty:
-                yield f"data: {json.dumps({'type': 'keepalive'})}\n\n"
+                yield sse_event({'type': 'keepalive'})
                 continue
 
             if result is None:
-                yield f"data: {json.dumps({'type': 'complete', 'status': task['status'], 'total': task['total'], 'succeeded': task['succeeded'], 'failed': task['failed']})}\n\n"
+                yield sse_event({'type': 'complete', 'status': task['status'], 'total': task['total'], 'succeeded': task['succeeded'], 'failed': task['failed']})
                 break
 
-            yield f"data: {json.dumps({'type': 'progress', 'user_id': result['user_id'], 'index': result['index'], 'result_status': result['status'], 'completed': task['completed'], 'total': task['total'], 'succeeded': task['succeeded'], 'failed': task['failed']})}\n\n"
+            yield sse_event({'type': 'progress', 'user_id': result['user_id'], 'index': result['index'], 'result_status': result['status'], 'completed': task['completed'], 'total': task['total'], 'succeeded': task['succeeded'], 'failed': task['failed']})
 
+    return sse_response(generate(), task.get("tracer", NULL_TRACER))
+
+
+@app.route("/api/trace/<task_id>")
+@login_required
+def api_trace(task_id):
+    """
+    Download a traced task's spans as Chrome trace-event JSON (open in Perfetto).
+    Only the account that started the task can read it; spans carry usernames.
+    """
+    task = cancel_tasks.get(task_id)
+    owned = task is not None and task.get("account") == session["ig_ds_user_id"]
+    if not owned or task.get("tracer", NULL_TRACER) is NULL_TRACER:
+        return jsonify({"error": "No trace for this task"}), 404
     return Response(
-        stream_with_context(generate()),
-        mimetype="text/event-stream",
-        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", "Connection": "keep-alive"},
+        _dumps(task["tracer"].chrome_trace()),
+        mimetype="application/json",
+        headers={"Content-Disposition": f'attachment; filename="{task_id}.trace.json"'},
     )
 
 
@@ -581,17 +724,29 @@ def api_proxy_image():
 @app.route("/api/resolve-usernames", methods=["POST"])
 @login_required
 def api_resolve_usernames():
-    data = request.get_json()
-    usernames = data.get("usernames", [])
+    """
+    Resolve a short list of usernames and check their outgoing request status
+    in one synchronous call. Longer lists go through /api/pending-sent and the
+    check-sent stream.
+    """
+    data = request.get_json(silent=True)
+    raw_list = data.get("usernames", []) if isinstance(data, dict) else None
+    if not isinstance(raw_list, list) or not all(isinstance(u, str) for u in raw_list):
+        return jsonify({"error": "usernames must be a list of strings."}), 400
+    usernames = []
+    for u in raw_list:
+        u = u.strip().lstrip("@")
+        if u and u not in usernames:
+            usernames.append(u)
     if not usernames:
         return jsonify({"error": "No usernames provided."}), 400
-    if len(usernames) > 200:
-        return jsonify({"error": "Max 200 usernames at a time."}), 400
+    if len(usernames) > Config.MAX_RESOLVE_USERNAMES:
+        return jsonify({"error": f"Max {Config.MAX_RESOLVE_USERNAMES} usernames at a time."}), 400
 
     try:
         api = get_ig_api()
-        users = api.get_pending_from_usernames(usernames)
-        return jsonify({"users": users, "count": len(users)})
+        users = api.check_outgoing_from_usernames(usernames)
+        return json_response({"users": users, "count": len(users)})
     except AuthenticationError as e:
         session.clear()
         return jsonify({"error": str(e), "auth_expired": True}), 401
@@ -601,6 +756,17 @@ def api_resolve_usernames():
         return jsonify({"error": str(e)}), 500
 
 
+# ------------------------------------------------------------------
+# API — Metrics
+# ------------------------------------------------------------------
+
+@app.route("/api/metrics")
+@login_required
+def api_metrics():
+    """Per-process health of the username lookup endpoints and fetch coalescing."""
+    return jsonify({"lookup_endpoints": lookup_endpoint_stats(), "inflight": inflight.stats()})
+
+
 # ------------------------------------------------------------------
 
 if __name__ == "__main__":
@@ -0,0 +1,98 @@
+"""
+Static Asset Fingerprinting
+---------------------------
+Builds a manifest of the static folder at startup: every file gets a
+content-hashed name (css/style.css -> css/style.3f2a9c1b7d4e.css) and
+text assets are precompressed once with gzip and, when the brotli package
+is installed, brotli. Hashed URLs never change content, so they are served
+with a one-year immutable Cache-Control.
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import os
+
+from flask import Response, request, url_for
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+COMPRESSIBLE = {".css", ".js", ".svg", ".json", ".txt", ".html"}
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+class Asset:
+    def __init__(self, path, data):
+        self.path = path
+        self.etag = hashlib.sha256(data).hexdigest()
+        self.mimetype = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        self.variants = {"identity": data}
+
+        if os.path.splitext(path)[1] in COMPRESSIBLE:
+            gz = gzip.compress(data, compresslevel=9, mtime=0)
+            if len(gz) < len(data):
+                self.variants["gzip"] = gz
+            if brotli is not None:
+                br = brotli.compress(data, quality=11)
+                if len(br) < len(data):
+                    self.variants["br"] = br
+
+    @property
+    def hashed_path(self):
+        root, ext = os.path.splitext(self.path)
+        return f"{root}.{self.etag[:12]}{ext}"
+
+
+class AssetManifest:
+    """Logical static paths -> fingerprinted, precompressed assets."""
+
+    def __init__(self, static_folder):
+        self.static_folder = static_folder
+        self.by_path = {}
+        self.by_hashed = {}
+        self.build()
+
+    def build(self):
+        for dirpath, _, filenames in os.walk(self.static_folder):
+            for name in filenames:
+                full = os.path.join(dirpath, name)
+                rel = os.path.relpath(full, self.static_folder).replace(os.sep, "/")
+                with open(full, "rb") as f:
+                    asset = Asset(rel, f.read())
+                self.by_path[rel] = asset
+                self.by_hashed[asset.hashed_path] = asset
+
+    def url(self, filename):
+        """Hashed URL for a static file; falls back to the plain static URL if unknown."""
+        asset = self.by_path.get(filename)
+        if asset is None:
+            return url_for("static", filename=filename)
+        return url_for("fingerprinted_asset", filename=asset.hashed_path)
+
+    def response(self, hashed_path):
+        """Serve a fingerprinted asset, picking the best precompressed variant."""
+        asset = self.by_hashed.get(hashed_path)
+        if asset is None:
+            return None
+
+        headers = {"Cache-Control": IMMUTABLE, "Vary": "Accept-Encoding"}
+        # Weak: the same validator covers every precompressed variant
+        if request.if_none_match.contains_weak(asset.etag):
+            resp = Response(status=304, headers=headers)
+            resp.set_etag(asset.etag, weak=True)
+            return resp
+
+        encoding = "identity"
+        for candidate in ("br", "gzip"):
+            if candidate in asset.variants and request.accept_encodings[candidate]:
+                encoding = candidate
+                break
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+
+        resp = Response(asset.variants[encoding], mimetype=asset.mimetype, headers=headers)
+        resp.set_etag(asset.etag, weak=True)
+        return resp
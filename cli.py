@@ -0,0 +1,171 @@
+"""
+InstaClean — Command-Line Tool
+------------------------------
+Headless bulk processing of Instagram data exports. Reads the usernames
+from an export zip or pending_follow_requests.html, checks or cancels each
+outgoing follow request with the same pacing as the web app, and writes one
+JSON object per line (NDJSON) to stdout.
+
+    python cli.py check export.zip --state run.ndjson > results.ndjson
+    python cli.py cancel pending_follow_requests.html --state run.ndjson
+
+Cookies come from --session-id/--ds-user-id/--csrf-token or the
+INSTACLEAN_SESSION_ID, INSTACLEAN_DS_USER_ID and INSTACLEAN_CSRF_TOKEN
+environment variables. With --state, every processed username is appended
+to the state file with the command that processed it, and a rerun skips
+those that reached a final status for the current command: a username
+left "pending" by check is still cancelled by a later cancel run.
+
+Exit codes: 0 done, 1 bad input, 2 rate limited, 3 authentication failed,
+4 Instagram unreachable or returned an error at startup.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+
+import requests
+
+from config import Config
+from exports import ExportError, load_export
+from instagram_api import InstagramAPI, InstagramAPIError, RateLimitError, AuthenticationError
+from ledger import ledger
+
+# Statuses worth trying again on a resumed run. not_found is cheap to re-check
+# and may hide a renamed account, so it never settles a username either.
+RETRY_STATUSES = {"rate_limited", "auth_error", "error", "unknown", "cancel_failed", "not_found"}
+# Statuses that leave nothing for either command to do
+NO_REQUEST_STATUSES = {"not_pending", "accepted"}
+
+EXIT_OK, EXIT_INPUT, EXIT_RATE_LIMITED, EXIT_AUTH, EXIT_UNAVAILABLE = 0, 1, 2, 3, 4
+
+
+def load_state(path):
+    """username -> (command, status) of its last line in an NDJSON state file."""
+    done = {}
+    if not path or not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # a torn last line from an interrupted run
+            if not isinstance(record, dict) or "username" not in record or "status" not in record:
+                continue  # e.g. the "complete" summary line, if stdout was passed as --state
+            done[record["username"]] = (record.get("command"), record["status"])
+    return done
+
+
+def is_settled(entry, command):
+    """Whether a state entry means command has nothing left to do for that username."""
+    if entry is None:
+        return False
+    recorded_command, status = entry
+    if recorded_command == command:
+        return status not in RETRY_STATUSES
+    return status in NO_REQUEST_STATUSES
+
+
+def emit(record, out=sys.stdout):
+    out.write(json.dumps(record, separators=(",", ":")) + "\n")
+    out.flush()
+
+
+def run(args, api, usernames, username_dates, state_file):
+    done = load_state(args.state)
+    remaining = [u for u in usernames if not is_settled(done.get(u), args.command)]
+    todo = remaining[:args.limit] if args.limit else remaining
+
+    counts = {}
+    total = len(todo)
+    reason = "done"
+    for i, username in enumerate(todo):
+        record = {"username": username, "index": i, "total": total}
+        if username in username_dates:
+            record["request_date"] = username_dates[username]
+
+        try:
+            if args.command == "check":
+                record.update(api.check_outgoing_status(username))
+            else:
+                record.update(api.cancel_outgoing_by_username(username))
+        except RateLimitError:
+            record["status"], reason = "rate_limited", "rate_limited"
+        except AuthenticationError:
+            record["status"], reason = "auth_error", "auth_error"
+        except Exception as e:
+            record["status"] = "error"
+            record["error"] = str(e)
+
+        ledger.record(args.ds_user_id, record["status"], username=username, user_id=record.get("user_id"))
+        counts[record["status"]] = counts.get(record["status"], 0) + 1
+        emit(record)
+        if state_file:
+            state_file.write(json.dumps({"username": username, "command": args.command,
+                                         "status": record["status"]}) + "\n")
+            state_file.flush()
+            os.fsync(state_file.fileno())
+
+        if reason != "done":
+            break
+        if i < total - 1:
+            if args.command == "check":
+                api.tracer.sleep(Config.FETCH_PAGE_DELAY, "pacing")
+            else:
+                api.tracer.sleep(random.uniform(Config.CANCEL_DELAY_MIN, Config.CANCEL_DELAY_MAX), "pacing")
+
+    emit({"type": "complete", "reason": reason, "processed": sum(counts.values()),
+          "skipped_from_state": len(usernames) - len(remaining),
+          "counts": counts})
+    return {"done": EXIT_OK, "rate_limited": EXIT_RATE_LIMITED, "auth_error": EXIT_AUTH}[reason]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check or cancel outgoing follow requests from an Instagram export.")
+    parser.add_argument("command", choices=["check", "cancel"])
+    parser.add_argument("export", help="Instagram data export zip or pending_follow_requests.html")
+    parser.add_argument("--session-id", default=os.environ.get("INSTACLEAN_SESSION_ID"))
+    parser.add_argument("--ds-user-id", default=os.environ.get("INSTACLEAN_DS_USER_ID"))
+    parser.add_argument("--csrf-token", default=os.environ.get("INSTACLEAN_CSRF_TOKEN"))
+    parser.add_argument("--state", metavar="PATH", help="NDJSON state file for resuming interrupted runs")
+    parser.add_argument("--limit", type=int, help="process at most this many usernames")
+    args = parser.parse_args(argv)
+
+    if not all([args.session_id, args.ds_user_id, args.csrf_token]):
+        parser.error("all three cookies are required (flags or INSTACLEAN_* environment variables)")
+
+    try:
+        usernames, username_dates = load_export(args.export)
+    except (OSError, ExportError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return EXIT_INPUT
+    if not usernames:
+        print("error: no usernames found in export", file=sys.stderr)
+        return EXIT_INPUT
+
+    api = InstagramAPI(args.session_id, args.ds_user_id, args.csrf_token)
+    try:
+        api.validate_session()
+    except RateLimitError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return EXIT_RATE_LIMITED
+    except AuthenticationError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return EXIT_AUTH
+    except (InstagramAPIError, requests.RequestException) as e:
+        print(f"error: could not validate session: {e}", file=sys.stderr)
+        return EXIT_UNAVAILABLE
+
+    state_file = open(args.state, "a", encoding="utf-8") if args.state else None
+    try:
+        return run(args, api, usernames, username_dates, state_file)
+    finally:
+        if state_file:
+            state_file.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
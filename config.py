@@ -5,7 +5,9 @@ class Config:
     SECRET_KEY = os.environ.get("SECRET_KEY", os.urandom(32).hex())
 
     # Instagram API
-    IG_BASE_URL = "https://i.instagram.com/api/v1"
+    # Base URLs can be pointed at a local fake upstream (see loadtest.py)
+    IG_BASE_URL = os.environ.get("IG_BASE_URL", "https://i.instagram.com/api/v1")
+    IG_WEB_BASE_URL = os.environ.get("IG_WEB_BASE_URL", "https://www.instagram.com/api/v1")
     IG_MOBILE_USER_AGENT = (
         "Instagram 317.0.0.34.109 Android (30/11; 420dpi; 1080x2220; "
         "samsung; SM-A515F; a51; exynos9611; en_US; 562800748)"
@@ -13,10 +15,43 @@ class Config:
     IG_APP_ID = "936619743392459"
 
     # Rate limiting
-    CANCEL_DELAY_MIN = 5
-    CANCEL_DELAY_MAX = 10
-    FETCH_PAGE_DELAY = 1
+    CANCEL_DELAY_MIN = float(os.environ.get("CANCEL_DELAY_MIN", 5))
+    CANCEL_DELAY_MAX = float(os.environ.get("CANCEL_DELAY_MAX", 10))
+    FETCH_PAGE_DELAY = float(os.environ.get("FETCH_PAGE_DELAY", 1))
     MAX_CANCELS_PER_SESSION = 200
+    # /api/resolve-usernames runs inside one request, which must finish within
+    # gunicorn's 120 s timeout at FETCH_PAGE_DELAY pacing
+    MAX_RESOLVE_USERNAMES = 50
+
+    # Retries for transient failures (timeouts, connection errors, 5xx)
+    RETRY_MAX_ATTEMPTS = 4
+    RETRY_BACKOFF_BASE = 1    # seconds; doubled per attempt, full jitter
+    RETRY_BACKOFF_MAX = 16
+    RETRY_DEADLINE = 60       # total seconds one call may spend including retries
+
+    # Username lookup endpoint health / circuit breaker
+    LOOKUP_FAILURE_THRESHOLD = 3   # consecutive failures before the circuit opens
+    LOOKUP_CIRCUIT_COOLDOWN = 60   # seconds before a half-open probe is allowed
+    LOOKUP_EWMA_ALPHA = 0.2        # weight of the newest sample in rate/latency averages
+
+    # Outcome ledger (SQLite, shared by all workers on the host)
+    LEDGER_PATH = os.environ.get("LEDGER_PATH", "instaclean_ledger.sqlite3")
+
+    # Incoming-request watcher
+    WATCH_POLL_INTERVAL = 60      # seconds between cheap first-page polls (and client change polls)
+    WATCH_MAX_PAGES = 2           # pages per incremental poll before falling back to a full sync
+    WATCH_FULL_SYNC_EVERY = 10    # every Nth poll re-reads the whole list to catch deep removals
+    WATCH_IDLE_TIMEOUT = 300      # stop a watcher this long after a client last asked for changes
+    WATCH_LOG_SIZE = 50           # recent deltas kept for cursor polling; older cursors get a snapshot
+    WATCH_MAX_BACKOFF = 900       # cap for the poll interval after rate limiting
+
+    # Task tracing (Chrome trace-event export)
+    TRACE_TASKS = os.environ.get("TRACE_TASKS") == "1"  # trace every task, not just ?trace=1
+    TRACE_BUFFER_SIZE = 20000                          # events kept per task (ring buffer)
+
+    # Response compression
+    COMPRESS_MIN_SIZE = 1024  # bytes; smaller JSON bodies are sent as-is
+    COMPRESS_LEVEL = 6
 
     # Flask session
     PERMANENT_SESSION_LIFETIME = 3600
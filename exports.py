@@ -0,0 +1,69 @@
+"""
+Instagram Data Export Parsing
+-----------------------------
+Pulls the usernames (and request dates, when present) out of
+pending_follow_requests.html, either directly or from the export zip.
+Shared by the web upload routes and the command-line tool.
+"""
+
+import re
+import zipfile
+
+PENDING_FILENAME = "pending_follow_requests.html"
+
+_PAIR_RE = re.compile(r'href="https://www\.instagram\.com/([^"/?]+)"[^<]*</a></div>\s*<div>([^<]+)</div>')
+_LINK_RE = re.compile(r'href="https://www\.instagram\.com/([^"/?]+)"')
+
+
+class ExportError(Exception):
+    pass
+
+
+def parse_pending_html(html):
+    """Return (usernames, {username: request date}) in file order, without duplicates."""
+    usernames = []
+    username_dates = {}
+    seen = set()
+    pairs = _PAIR_RE.findall(html)
+    if pairs:
+        for uname, date_str in pairs:
+            if uname not in seen:
+                seen.add(uname)
+                usernames.append(uname)
+                username_dates[uname] = date_str.strip()
+    else:
+        for uname in _LINK_RE.findall(html):
+            if uname not in seen:
+                seen.add(uname)
+                usernames.append(uname)
+    return usernames, username_dates
+
+
+def find_pending_html(zf):
+    """Name of pending_follow_requests.html inside an open ZipFile, or None."""
+    for name in zf.namelist():
+        if name.endswith(PENDING_FILENAME):
+            return name
+    return None
+
+
+def read_pending_from_zip(zf):
+    """Return (member name, html) for the pending requests file; raises ExportError if missing."""
+    target = find_pending_html(zf)
+    if not target:
+        html_files = [n for n in zf.namelist() if n.endswith(".html")]
+        raise ExportError(
+            f"Could not find {PENDING_FILENAME} in the zip. Found {len(html_files)} HTML files."
+        )
+    return target, zf.read(target).decode("utf-8", errors="ignore")
+
+
+def load_export(path):
+    """Parse a zip export or a bare HTML file from disk. Returns (usernames, dates)."""
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as zf:
+            _, html = read_pending_from_zip(zf)
+    else:
+        with open(path, encoding="utf-8", errors="ignore") as f:
+            html = f.read()
+    return parse_pending_html(html)
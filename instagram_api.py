@@ -5,8 +5,14 @@ Direct HTTP requests to Instagram's mobile API using session cookies.
 """
 
 import time
+import random
+import threading
+from urllib.parse import urlsplit
+
 import requests
 from config import Config
+from singleflight import SingleFlight
+from tracing import NULL_TRACER
 
 
 class InstagramAPIError(Exception):
@@ -21,6 +27,118 @@ class AuthenticationError(InstagramAPIError):
     pass
 
 
+class EndpointHealth:
+    """
+    Rolling success rate and latency for one lookup endpoint, plus a
+    circuit breaker: after LOOKUP_FAILURE_THRESHOLD consecutive failures the
+    endpoint is skipped until LOOKUP_CIRCUIT_COOLDOWN has passed, then a
+    single half-open probe decides whether it closes again.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.lock = threading.Lock()
+        self.success_rate = 1.0
+        self.latency = 0.0
+        self.requests = 0
+        self.failures = 0
+        self.routed_first = 0
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.probing = False
+        self.updated_at = None
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if self.probing or time.monotonic() - self.opened_at >= Config.LOOKUP_CIRCUIT_COOLDOWN:
+            return "half_open"
+        return "open"
+
+    def allow(self):
+        """Whether a request may be sent now. Claims the probe slot when half-open."""
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            if self.probing or time.monotonic() - self.opened_at < Config.LOOKUP_CIRCUIT_COOLDOWN:
+                return False
+            self.probing = True
+            return True
+
+    def record(self, ok, elapsed):
+        alpha = Config.LOOKUP_EWMA_ALPHA
+        with self.lock:
+            self.updated_at = time.monotonic()
+            self.requests += 1
+            self.success_rate += alpha * ((1.0 if ok else 0.0) - self.success_rate)
+            self.latency = elapsed if self.requests == 1 else self.latency + alpha * (elapsed - self.latency)
+            if ok:
+                self.consecutive_failures = 0
+                self.opened_at = None
+            else:
+                self.failures += 1
+                self.consecutive_failures += 1
+                if self.probing or self.consecutive_failures >= Config.LOOKUP_FAILURE_THRESHOLD:
+                    self.opened_at = time.monotonic()
+            self.probing = False
+
+    def rank_key(self):
+        """
+        Sort key, lower is better. Stats older than the cooldown are ignored
+        so an endpoint that lost the ranking (or whose circuit is ready for
+        a half-open probe) is tried first again once it may have recovered.
+        """
+        with self.lock:
+            stale = self.updated_at is None or time.monotonic() - self.updated_at >= Config.LOOKUP_CIRCUIT_COOLDOWN
+            if stale:
+                return (-1.0, 0.0)
+            return (-round(self.success_rate, 1), self.latency)
+
+    def release_probe(self):
+        """Give back a half-open probe slot without recording a result."""
+        with self.lock:
+            self.probing = False
+
+    def mark_routed_first(self):
+        with self.lock:
+            self.routed_first += 1
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "endpoint": self.name,
+                "state": self.state,
+                "success_rate": round(self.success_rate, 3),
+                "latency_ms": round(self.latency * 1000),
+                "requests": self.requests,
+                "failures": self.failures,
+                "routed_first": self.routed_first,
+            }
+
+
+# Shared across InstagramAPI instances (one is created per request)
+_lookup_endpoints = {
+    "usernameinfo": EndpointHealth("usernameinfo"),
+    "web_profile_info": EndpointHealth("web_profile_info"),
+}
+
+
+def _ranked_lookup_endpoints():
+    """Healthiest endpoint first: higher success rate, then lower latency."""
+    endpoints = list(_lookup_endpoints.values())  # dict order breaks ties
+    return sorted(endpoints, key=lambda e: e.rank_key())
+
+
+# Coalesces identical concurrent upstream fetches (lookups, images, full list runs)
+inflight = SingleFlight()
+
+
+def lookup_endpoint_stats():
+    """Per-endpoint health for the metrics route."""
+    return [e.snapshot() for e in _lookup_endpoints.values()]
+
+
 class InstagramAPI:
     """Interact with Instagram's private mobile API using session cookies."""
 
@@ -29,6 +147,7 @@ class InstagramAPI:
         self.ds_user_id = ds_user_id
         self.csrf_token = csrf_token
         self.http = requests.Session()
+        self.tracer = NULL_TRACER  # set to a tracing.Tracer to record upstream calls and waits
         self._setup()
 
     def _setup(self):
@@ -47,6 +166,43 @@ class InstagramAPI:
             "Referer": "https://www.instagram.com/",
         })
 
+    def _request(self, method, url, idempotent=False, **kwargs):
+        """
+        Send a request, retrying timeouts, connection errors and 5xx
+        responses for GETs and calls marked idempotent. Backoff is
+        exponential with full jitter, bounded by RETRY_MAX_ATTEMPTS and an
+        overall RETRY_DEADLINE budget. The last response or error is
+        returned/raised when retries run out.
+        """
+        retryable = method == "GET" or idempotent
+        timeout = kwargs.pop("timeout", 15)
+        deadline = time.monotonic() + Config.RETRY_DEADLINE
+        attempt = 0
+        while True:
+            attempt += 1
+            remaining = deadline - time.monotonic()
+            with self.tracer.span(f"{method} {urlsplit(url).path}", "upstream", attempt=attempt) as span:
+                try:
+                    resp = self.http.request(method, url, timeout=min(timeout, max(remaining, 1)), **kwargs)
+                    error = None
+                    span["status"] = resp.status_code
+                except (requests.Timeout, requests.ConnectionError) as e:
+                    resp, error = None, e
+                    span["error"] = type(e).__name__
+            if resp is not None and resp.status_code < 500:
+                if resp.status_code == 429:
+                    self.tracer.instant("rate_limited", "upstream", path=urlsplit(url).path)
+                return resp
+
+            backoff = min(Config.RETRY_BACKOFF_MAX, Config.RETRY_BACKOFF_BASE * 2 ** (attempt - 1))
+            delay = random.uniform(0, backoff)
+            if (not retryable or attempt >= Config.RETRY_MAX_ATTEMPTS
+                    or time.monotonic() + delay >= deadline):
+                if error is not None:
+                    raise error
+                return resp
+            self.tracer.sleep(delay, "retry_backoff")
+
     def _handle(self, resp):
         if resp.status_code == 429:
             raise RateLimitError("Rate limited by Instagram. Wait a few minutes.")
@@ -75,7 +231,7 @@ class InstagramAPI:
     def validate_session(self):
         """Validate cookies by fetching the user's own profile."""
         url = f"{Config.IG_BASE_URL}/accounts/current_user/?edit=true"
-        data = self._handle(self.http.get(url, timeout=15))
+        data = self._handle(self._request("GET", url))
         user = data.get("user", {})
         return {
             "user_id": user.get("pk"),
@@ -89,51 +245,118 @@ class InstagramAPI:
     # ------------------------------------------------------------------
 
     def get_user_by_username(self, username):
-        """Look up a user's ID and info by username (tries multiple endpoints)."""
-        # Try 1: Mobile API endpoint
-        try:
-            url = f"{Config.IG_BASE_URL}/users/{username}/usernameinfo/"
-            resp = self.http.get(url, timeout=15)
-            if resp.status_code == 200:
-                data = resp.json()
-                user = data.get("user", {})
-                if user and user.get("pk"):
-                    return {
-                        "user_id": user.get("pk"),
-                        "username": user.get("username", username),
-                        "full_name": user.get("full_name", ""),
-                        "profile_pic_url": user.get("profile_pic_url", ""),
-                        "is_private": user.get("is_private", False),
-                        "is_verified": user.get("is_verified", False),
-                    }
-        except Exception:
-            pass
+        """Look up a user's ID and info by username. Concurrent identical lookups share one fetch."""
+        user = inflight.do(
+            (self.ds_user_id, "get_user_by_username", username.lower()),
+            lambda: self._resolve_username(username),
+        )
+        return dict(user) if user else None
+
+    def _resolve_username(self, username):
+        """
+        Uncoalesced lookup. Endpoints are tried healthiest first (see EndpointHealth); a lookup
+        that fails or finds nothing on one endpoint falls through to the next.
+        Lookups are not retried — failing over to the next endpoint is cheaper.
+
+        Returns None only when an endpoint definitely answered "no such user".
+        Rate-limit and auth errors apply to the whole account, so they propagate
+        without counting against endpoint health; if every endpoint tried failed
+        otherwise, InstagramAPIError is raised rather than a false "not found".
+        """
+        lookups = {
+            "usernameinfo": self._lookup_usernameinfo,
+            "web_profile_info": self._lookup_web_profile_info,
+        }
+        failed = object()
 
-        # Try 2: Web profile info endpoint
-        try:
-            url = "https://www.instagram.com/api/v1/users/web_profile_info/"
-            resp = self.http.get(url, params={"username": username}, timeout=15)
-            if resp.status_code == 200:
-                data = resp.json()
-                user = data.get("data", {}).get("user", {})
-                if user and user.get("id"):
-                    return {
-                        "user_id": user.get("id"),
-                        "username": user.get("username", username),
-                        "full_name": user.get("full_name", ""),
-                        "profile_pic_url": user.get("profile_pic_url", ""),
-                        "is_private": user.get("is_private", False),
-                        "is_verified": user.get("is_verified", False),
-                    }
-        except Exception:
-            pass
+        def attempt(endpoint):
+            start = time.monotonic()
+            with self.tracer.span(f"lookup {endpoint.name}", "upstream", username=username) as span:
+                try:
+                    user = lookups[endpoint.name](username)
+                except (RateLimitError, AuthenticationError) as e:
+                    span["error"] = type(e).__name__
+                    endpoint.release_probe()
+                    raise
+                except Exception as e:
+                    span["error"] = type(e).__name__
+                    endpoint.record(False, time.monotonic() - start)
+                    return failed
+            endpoint.record(True, time.monotonic() - start)
+            return user
+
+        ranked = _ranked_lookup_endpoints()
+        attempted = False
+        definite_miss = False
+        for endpoint in ranked:
+            if not endpoint.allow():
+                continue
+            if not attempted:
+                endpoint.mark_routed_first()
+                attempted = True
+            user = attempt(endpoint)
+            if user is failed:
+                continue
+            if user:
+                return user
+            definite_miss = True
+
+        if not attempted:
+            # Every circuit is open — better a slow lookup than a false "not found"
+            ranked[0].mark_routed_first()
+            user = attempt(ranked[0])
+            if user is not failed:
+                return user
+        elif definite_miss:
+            return None
+        raise InstagramAPIError(f"Could not look up @{username}: every lookup endpoint failed.")
+
+    def _lookup_usernameinfo(self, username):
+        """Mobile API lookup. Returns None when the user doesn't exist; raises on failure."""
+        url = f"{Config.IG_BASE_URL}/users/{username}/usernameinfo/"
+        resp = self.http.get(url, timeout=15)
+        if resp.status_code in (401, 403, 429):
+            self._handle(resp)  # account-wide: raises AuthenticationError / RateLimitError
+        if resp.status_code == 404:
+            return None
+        resp.raise_for_status()
+        user = resp.json().get("user", {})
+        if not user or not user.get("pk"):
+            return None
+        return {
+            "user_id": user.get("pk"),
+            "username": user.get("username", username),
+            "full_name": user.get("full_name", ""),
+            "profile_pic_url": user.get("profile_pic_url", ""),
+            "is_private": user.get("is_private", False),
+            "is_verified": user.get("is_verified", False),
+        }
 
-        return None
+    def _lookup_web_profile_info(self, username):
+        """Web profile lookup. Returns None when the user doesn't exist; raises on failure."""
+        url = f"{Config.IG_WEB_BASE_URL}/users/web_profile_info/"
+        resp = self.http.get(url, params={"username": username}, timeout=15)
+        if resp.status_code in (401, 403, 429):
+            self._handle(resp)  # account-wide: raises AuthenticationError / RateLimitError
+        if resp.status_code == 404:
+            return None
+        resp.raise_for_status()
+        user = (resp.json().get("data") or {}).get("user") or {}
+        if not user.get("id"):
+            return None
+        return {
+            "user_id": user.get("id"),
+            "username": user.get("username", username),
+            "full_name": user.get("full_name", ""),
+            "profile_pic_url": user.get("profile_pic_url", ""),
+            "is_private": user.get("is_private", False),
+            "is_verified": user.get("is_verified", False),
+        }
 
     def check_friendship(self, user_id):
         """Check relationship status with a user. Returns dict with outgoing_request, following, etc."""
         url = f"{Config.IG_BASE_URL}/friendships/show/{user_id}/"
-        data = self._handle(self.http.get(url, timeout=15))
+        data = self._handle(self._request("GET", url))
         if not data:
             return None
         return data
@@ -142,62 +365,111 @@ class InstagramAPI:
     # Pending follow requests (outgoing)
     # ------------------------------------------------------------------
 
+    def check_outgoing_status(self, username):
+        """
+        Resolve a username and check whether our follow request is still pending.
+        Returns a user dict with a status of pending, accepted, not_pending,
+        unknown or not_found. Rate-limit and auth errors propagate, as does
+        InstagramAPIError when the username couldn't be looked up at all.
+        """
+        user = self.get_user_by_username(username)
+        if not user:
+            return {
+                "user_id": None,
+                "username": username,
+                "full_name": "",
+                "profile_pic_url": "",
+                "is_private": False,
+                "is_verified": False,
+                "status": "not_found",
+            }
+        try:
+            status = self.check_friendship(user["user_id"])
+            if status and status.get("outgoing_request"):
+                user["status"] = "pending"
+            elif status and status.get("following"):
+                user["status"] = "accepted"
+            else:
+                user["status"] = "not_pending"
+        except (RateLimitError, AuthenticationError):
+            raise
+        except Exception:
+            user["status"] = "unknown"
+        return user
+
+    def cancel_outgoing_by_username(self, username):
+        """
+        Resolve a username and cancel our follow request to it.
+        Returns a result dict with a status of cancelled, cancel_failed or
+        not_found. Rate-limit and auth errors propagate, as does
+        InstagramAPIError when the username couldn't be looked up at all.
+        """
+        user = self.get_user_by_username(username)
+        if not user or not user.get("user_id"):
+            return {"username": username, "status": "not_found"}
+        result = {
+            "username": username,
+            "user_id": user["user_id"],
+            "profile_pic_url": user.get("profile_pic_url", ""),
+            "full_name": user.get("full_name", ""),
+        }
+        try:
+            self.cancel_follow_request(user["user_id"])
+            result["status"] = "cancelled"
+        except (RateLimitError, AuthenticationError):
+            raise
+        except Exception as e:
+            result["status"] = "cancel_failed"
+            result["error"] = str(e)
+        return result
+
     def check_outgoing_from_usernames(self, usernames):
         """
         Check a list of usernames for outgoing pending requests.
         Returns list of user dicts with status field.
         """
         results = []
-        for username in usernames:
-            user = self.get_user_by_username(username)
-            if user:
-                try:
-                    status = self.check_friendship(user["user_id"])
-                    if status and status.get("outgoing_request"):
-                        user["status"] = "pending"
-                    elif status and status.get("following"):
-                        user["status"] = "accepted"
-                    else:
-                        user["status"] = "not_pending"
-                except Exception:
-                    user["status"] = "unknown"
-                results.append(user)
-            else:
-                results.append({
-                    "user_id": None,
-                    "username": username,
-                    "full_name": "",
-                    "profile_pic_url": "",
-                    "is_private": False,
-                    "is_verified": False,
-                    "status": "not_found",
-                })
-            time.sleep(Config.FETCH_PAGE_DELAY)
+        for i, username in enumerate(usernames):
+            try:
+                results.append(self.check_outgoing_status(username))
+            except (RateLimitError, AuthenticationError):
+                raise
+            except InstagramAPIError:
+                results.append({"username": username, "user_id": None, "status": "error"})
+            if i < len(usernames) - 1:
+                self.tracer.sleep(Config.FETCH_PAGE_DELAY, "pacing")
         return results
 
     def get_incoming_pending_requests(self):
-        """Fetch incoming pending follow requests (people who requested to follow YOU)."""
+        """
+        Fetch incoming pending follow requests (people who requested to follow YOU).
+        Errors on any page propagate, so callers never mistake a partial list
+        for the whole one.
+        """
         users = []
         max_id = None
         while True:
-            url = f"{Config.IG_BASE_URL}/friendships/pending/"
-            params = {}
-            if max_id:
-                params["max_id"] = max_id
-            try:
-                data = self._handle(self.http.get(url, params=params, timeout=15))
-            except InstagramAPIError:
-                break
-            if not data:
+            page, max_id = self.get_incoming_pending_page(max_id)
+            users.extend(page)
+            if not max_id:
                 break
-            for user in data.get("users", []):
-                users.append(self._parse_user(user))
-            if not data.get("big_list") or not data.get("next_max_id"):
-                break
-            max_id = data["next_max_id"]
-            time.sleep(Config.FETCH_PAGE_DELAY)
+            self.tracer.sleep(Config.FETCH_PAGE_DELAY, "page_delay")
         return users
 
+    def get_incoming_pending_page(self, max_id=None):
+        """One page of incoming requests, newest first. Returns (users, next_max_id or None)."""
+        url = f"{Config.IG_BASE_URL}/friendships/pending/"
+        params = {}
+        if max_id:
+            params["max_id"] = max_id
+        data = self._handle(self._request("GET", url, params=params))
+        if not data:
+            return [], None
+        users = [self._parse_user(user) for user in data.get("users", [])]
+        if not data.get("big_list") or not data.get("next_max_id"):
+            return users, None
+        return users, data["next_max_id"]
+
     # ------------------------------------------------------------------
     # Following / Followers
     # ------------------------------------------------------------------
@@ -211,13 +483,15 @@ class InstagramAPI:
         return list(self._paginate_friendships(f"{uid}/followers"))
 
     def _paginate_friendships(self, path):
+        # Each page is retried on its own, so a transient failure resumes
+        # from the current max_id instead of discarding earlier pages.
         max_id = None
         while True:
             url = f"{Config.IG_BASE_URL}/friendships/{path}/"
             params = {"count": 200}
             if max_id:
                 params["max_id"] = max_id
-            data = self._handle(self.http.get(url, params=params, timeout=15))
+            data = self._handle(self._request("GET", url, params=params))
             if not data:
                 return
 
@@ -227,7 +501,7 @@ class InstagramAPI:
             if not data.get("big_list") or not data.get("next_max_id"):
                 break
             max_id = data["next_max_id"]
-            time.sleep(Config.FETCH_PAGE_DELAY)
+            self.tracer.sleep(Config.FETCH_PAGE_DELAY, "page_delay")
 
     def get_not_following_back(self):
         following = {u["user_id"]: u for u in self.get_following()}
@@ -240,7 +514,8 @@ class InstagramAPI:
 
     def cancel_follow_request(self, user_id):
         url = f"{Config.IG_BASE_URL}/friendships/destroy/{user_id}/"
-        return self._handle(self.http.post(url, timeout=15))
+        # Destroying an already-removed request/follow is a no-op, so retrying is safe
+        return self._handle(self._request("POST", url, idempotent=True))
 
     def unfollow_user(self, user_id):
         return self.cancel_follow_request(user_id)
@@ -251,6 +526,9 @@ class InstagramAPI:
 
     def fetch_image(self, image_url):
         """Fetch an image from Instagram's CDN. Returns (content_bytes, content_type)."""
+        return inflight.do(("fetch_image", image_url), lambda: self._fetch_image(image_url))
+
+    def _fetch_image(self, image_url):
         try:
             resp = self.http.get(image_url, timeout=10)
             resp.raise_for_status()
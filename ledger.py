@@ -0,0 +1,150 @@
+"""
+Outcome Ledger
+--------------
+Persistent record of the last outcome per (account, username/user_id),
+kept in SQLite so it survives restarts and is shared by all gunicorn
+workers. New sent-request tasks consult it to skip accounts that were
+already settled in an earlier run.
+"""
+
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+from config import Config
+
+# Outcomes after which there's no outgoing request left to act on
+SETTLED = {"cancelled", "not_pending", "accepted"}
+# Probably gone for good, but cheap to re-check at the end of a run. Only a
+# definite miss reaches the ledger as not_found: failed lookups raise (see
+# InstagramAPI._resolve_username) and are recorded as nothing at all.
+DEPRIORITIZED = {"not_found"}
+# Transient results aren't worth remembering
+TRANSIENT = {"rate_limited", "auth_error", "error", "unknown", "cancel_failed"}
+
+# Date format used in pending_follow_requests.html, e.g. "Jan 05, 2024 3:04 pm"
+EXPORT_DATE_FORMATS = ("%b %d, %Y %I:%M %p", "%b %d, %Y, %I:%M %p")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outcomes (
+    account    TEXT NOT NULL,
+    username   TEXT,
+    user_id    TEXT,
+    status     TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS outcomes_account_username
+    ON outcomes (account, username) WHERE username IS NOT NULL;
+CREATE INDEX IF NOT EXISTS outcomes_account_user_id
+    ON outcomes (account, user_id);
+"""
+
+
+def _export_timestamp(date_str):
+    for fmt in EXPORT_DATE_FORMATS:
+        try:
+            return datetime.strptime(date_str.strip(), fmt).timestamp()
+        except (ValueError, AttributeError):
+            continue
+    return None
+
+
+class OutcomeLedger:
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def record(self, account, status, username=None, user_id=None):
+        """
+        Remember an outcome. Rows are matched by username when known, else
+        by user_id. Best effort: a locked or unwritable database never fails
+        the task that is reporting the outcome.
+        """
+        if status in TRANSIENT or (username is None and user_id is None):
+            return
+        try:
+            self._record(str(account), status, username, user_id)
+        except sqlite3.Error:
+            pass
+
+    def _record(self, account, status, username, user_id):
+        user_id = str(user_id) if user_id is not None else None
+        now = time.time()
+        with self._conn() as conn:
+            if username is not None:
+                conn.execute(
+                    "INSERT INTO outcomes (account, username, user_id, status, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT (account, username) WHERE username IS NOT NULL DO UPDATE SET "
+                    "status = excluded.status, updated_at = excluded.updated_at, "
+                    "user_id = COALESCE(excluded.user_id, outcomes.user_id)",
+                    (account, username.lower(), user_id, status, now),
+                )
+                return
+            cur = conn.execute(
+                "UPDATE outcomes SET status = ?, updated_at = ? WHERE account = ? AND user_id = ?",
+                (status, now, account, user_id),
+            )
+            if cur.rowcount == 0:
+                conn.execute(
+                    "INSERT INTO outcomes (account, username, user_id, status, updated_at) "
+                    "VALUES (?, NULL, ?, ?, ?)",
+                    (account, user_id, status, now),
+                )
+
+    def lookup(self, account, usernames):
+        """username (as given) -> (status, updated_at) for those with a recorded outcome."""
+        by_lower = {u.lower(): u for u in usernames}
+        keys = list(by_lower)
+        found = {}
+        conn = self._conn()
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            rows = conn.execute(
+                f"SELECT username, status, updated_at FROM outcomes "
+                f"WHERE account = ? AND username IN ({','.join('?' * len(chunk))})",
+                (str(account), *chunk),
+            )
+            for username, status, updated_at in rows:
+                found[by_lower[username]] = (status, updated_at)
+        return found
+
+    def triage(self, account, usernames, username_dates=None):
+        """
+        Split usernames into (to_process, skipped). Settled entries are
+        skipped unless the export shows a request newer than the recorded
+        outcome (it was sent again); deprioritized ones go to the end.
+        """
+        username_dates = username_dates or {}
+        try:
+            known = self.lookup(account, usernames)
+        except sqlite3.Error:
+            return list(usernames), []
+        first, last, skipped = [], [], []
+        for username in usernames:
+            status, updated_at = known.get(username, (None, None))
+            requested_at = _export_timestamp(username_dates.get(username, ""))
+            resent = bool(status) and requested_at is not None and requested_at > updated_at
+            if status in SETTLED and not resent:
+                skipped.append(username)
+            elif status in DEPRIORITIZED and not resent:
+                last.append(username)
+            else:
+                first.append(username)
+        return first + last, skipped
+
+
+ledger = OutcomeLedger(Config.LEDGER_PATH)
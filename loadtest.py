@@ -0,0 +1,530 @@
+"""
+InstaClean — Load Test Harness
+------------------------------
+Runs the app under the Procfile's gunicorn command against a local fake
+Instagram upstream and drives it with N simulated logged-in accounts.
+
+Each account logs in once, then loops over a weighted mix of zip uploads,
+check-sent streams, batch cancels and avatar-heavy list renders. A probe
+hits a cheap page twice a second: its latency rising is the sign that
+every gunicorn thread slot is busy (mostly held by SSE streams) and new
+requests are queueing.
+
+    python loadtest.py --accounts 1,2,4,8,16 --duration 60
+    python loadtest.py --accounts 8 --pacing fast --json results.json
+
+Linux only (worker memory is read from /proc).
+"""
+
+import argparse
+import io
+import json
+import os
+import random
+import re
+import shlex
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import requests
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Op name -> default weight in each account's mix
+DEFAULT_MIX = "zip=2,check_sent=3,cancel=2,list=3"
+
+FAST_PACING = {"CANCEL_DELAY_MIN": "0.2", "CANCEL_DELAY_MAX": "0.5", "FETCH_PAGE_DELAY": "0.05"}
+
+
+# ------------------------------------------------------------------
+# Fake Instagram upstream
+# ------------------------------------------------------------------
+
+def _user_id(username):
+    return 10_000 + (sum(ord(c) * 31 ** i for i, c in enumerate(username)) % 10_000_000)
+
+
+class FakeInstagram(BaseHTTPRequestHandler):
+    """Just enough of the private API for every code path the app exercises."""
+
+    latency = 0.05
+    list_size = 400
+    page_size = 200
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body, content_type="application/json"):
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _user(self, username):
+        pic = f"http://{self.headers['Host']}/cdninstagram/{_user_id(username) % 50}.jpg"
+        return {"pk": _user_id(username), "username": username, "full_name": username.title(),
+                "profile_pic_url": pic, "is_private": False, "is_verified": False}
+
+    def _page(self, query, step=1):
+        start = int(query.get("max_id", ["0"])[0])
+        end = min(start + self.page_size, self.list_size)
+        users = [self._user(f"user{i}") for i in range(start, end) if i % step == 0]
+        more = end < self.list_size
+        return {"users": users, "big_list": more, "next_max_id": str(end) if more else None}
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        url = urlparse(self.path)
+        path, query = url.path, parse_qs(url.query)
+
+        if path.startswith("/cdninstagram/"):
+            return self._send(200, b"\xff\xd8\xff\xe0" + os.urandom(2048), "image/jpeg")
+        if path.endswith("/accounts/current_user/"):
+            return self._send(200, {"user": self._user("loadtest")})
+        m = re.search(r"/users/([^/]+)/usernameinfo/$", path)
+        if m:
+            return self._send(200, {"user": self._user(m.group(1))})
+        if path.endswith("/users/web_profile_info/"):
+            user = self._user(query.get("username", ["x"])[0])
+            user["id"] = user.pop("pk")
+            return self._send(200, {"data": {"user": user}})
+        m = re.search(r"/friendships/show/(\d+)/$", path)
+        if m:
+            return self._send(200, {"outgoing_request": int(m.group(1)) % 3 != 0, "following": False})
+        if path.endswith("/friendships/pending/") or path.endswith("/following/"):
+            return self._send(200, self._page(query))
+        if path.endswith("/followers/"):
+            # Every other followed user follows back
+            return self._send(200, self._page(query, step=2))
+        self._send(404, {"message": "not found"})
+
+    def do_POST(self):
+        time.sleep(self.latency)
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        if re.search(r"/friendships/destroy/\d+/$", self.path):
+            return self._send(200, {"status": "ok"})
+        self._send(404, {"message": "not found"})
+
+
+def start_fake_upstream(latency, list_size):
+    FakeInstagram.latency = latency
+    FakeInstagram.list_size = list_size
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeInstagram)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# ------------------------------------------------------------------
+# App under test (Procfile command)
+# ------------------------------------------------------------------
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def procfile_command(port):
+    with open(os.path.join(HERE, "Procfile")) as f:
+        for line in f:
+            if line.startswith("web:"):
+                cmd = line[len("web:"):].strip().replace("$PORT", str(port))
+                return shlex.split(cmd.replace("0.0.0.0", "127.0.0.1"))
+    raise SystemExit("No web process in Procfile")
+
+
+def thread_slots(cmd):
+    joined = " ".join(cmd)
+    workers = int((re.search(r"--workers[= ](\d+)", joined) or [None, 1])[1])
+    threads = int((re.search(r"--threads[= ](\d+)", joined) or [None, 1])[1])
+    return workers, threads
+
+
+def start_app(upstream_url, pacing, ledger_path):
+    """
+    Start the Procfile command against the fake upstream. Each level gets
+    its own empty outcome ledger; a shared one would let earlier levels'
+    outcomes skip later levels' targets and shrink their workload.
+    """
+    port = _free_port()
+    cmd = procfile_command(port)
+    env = dict(os.environ)
+    env.update({
+        "IG_BASE_URL": f"{upstream_url}/api/v1",
+        "IG_WEB_BASE_URL": f"{upstream_url}/api/v1",
+        "SECRET_KEY": "loadtest",
+        "FLASK_ENV": "production",
+        "LEDGER_PATH": ledger_path,
+    })
+    if pacing == "fast":
+        env.update(FAST_PACING)
+    proc = subprocess.Popen(cmd, cwd=HERE, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+
+    base = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        if proc.poll() is not None:
+            raise SystemExit(f"gunicorn exited: {proc.stderr.read().decode(errors='ignore')[-2000:]}")
+        try:
+            requests.get(f"{base}/login", timeout=1)
+            return proc, base, cmd
+        except requests.ConnectionError:
+            time.sleep(0.1)
+    proc.terminate()
+    raise SystemExit("gunicorn did not start listening")
+
+
+def stop_app(proc):
+    proc.terminate()
+    try:
+        proc.wait(timeout=35)  # gunicorn's graceful timeout is 30 s
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+
+
+def worker_rss(master_pid):
+    """RSS in MB for each gunicorn worker (children of the master)."""
+    rss = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+            if ppid != master_pid:
+                continue
+            with open(f"/proc/{entry}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        rss[int(entry)] = int(line.split()[1]) / 1024
+        except (OSError, ValueError, IndexError):
+            continue
+    return rss
+
+
+# ------------------------------------------------------------------
+# Simulated accounts
+# ------------------------------------------------------------------
+
+class Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = {}   # op -> [seconds]
+        self.errors = {}    # op -> count
+        # HTTP requests open against the app (each one is held by, or queued
+        # for, a gunicorn thread slot); streams count until they are closed
+        self.requests_in_flight = 0
+        self.max_requests_in_flight = 0
+        self.in_flight_samples = []
+
+    def request_started(self):
+        with self.lock:
+            self.requests_in_flight += 1
+            self.max_requests_in_flight = max(self.max_requests_in_flight, self.requests_in_flight)
+
+    def request_finished(self):
+        with self.lock:
+            self.requests_in_flight -= 1
+
+    def sample_in_flight(self):
+        with self.lock:
+            self.in_flight_samples.append(self.requests_in_flight)
+
+    def record(self, op, elapsed, ok):
+        with self.lock:
+            self.samples.setdefault(op, []).append(elapsed)
+            if not ok:
+                self.errors[op] = self.errors.get(op, 0) + 1
+
+
+class CountingSession(requests.Session):
+    """requests.Session that reports every request's lifetime to Stats."""
+
+    def __init__(self, stats):
+        super().__init__()
+        self.stats = stats
+
+    def request(self, method, url, **kwargs):
+        self.stats.request_started()
+        try:
+            resp = super().request(method, url, **kwargs)
+        except BaseException:
+            self.stats.request_finished()
+            raise
+        if not kwargs.get("stream"):
+            self.stats.request_finished()  # body already read
+            return resp
+
+        close = resp.close
+        closed = threading.Event()
+
+        def close_and_count():
+            if not closed.is_set():
+                closed.set()
+                self.stats.request_finished()
+            close()
+
+        resp.close = close_and_count
+        return resp
+
+
+def _export_zip(usernames):
+    rows = "".join(
+        f'<div><div><a target="_blank" href="https://www.instagram.com/{u}">{u}</a></div>'
+        f'<div>Jan 05, 2024 3:04 pm</div></div>'
+        for u in usernames
+    )
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("connections/followers_and_following/pending_follow_requests.html",
+                    f"<html><body>{rows}</body></html>")
+    return buf.getvalue()
+
+
+def _read_stream(resp):
+    """Consume an SSE response until its complete event. Returns False on a premature end."""
+    for line in resp.iter_lines():
+        if line.startswith(b"data: ") and b'"type":"complete"' in line.replace(b" ", b""):
+            return True
+    return False
+
+
+class Account(threading.Thread):
+    def __init__(self, index, base, stats, stop, args, mix):
+        super().__init__(daemon=True)
+        self.index = index
+        self.base = base
+        self.stats = stats
+        self.stop = stop
+        self.args = args
+        self.mix = mix
+        self.http = CountingSession(stats)
+        self.usernames = [f"target{index}_{i}" for i in range(args.sent_size)]
+
+    def timed(self, op, fn):
+        start = time.monotonic()
+        ok = False
+        try:
+            ok = fn()
+        except requests.RequestException:
+            ok = False
+        finally:
+            self.stats.record(op, time.monotonic() - start, ok)
+        return ok
+
+    def login(self):
+        r = self.http.post(f"{self.base}/login", json={
+            "session_id": f"sess{self.index}", "ds_user_id": str(1000 + self.index), "csrf_token": "csrf",
+        }, timeout=30)
+        return r.ok
+
+    def op_zip(self):
+        files = {"zip_file": ("export.zip", _export_zip(self.usernames), "application/zip")}
+        r = self.http.post(f"{self.base}/api/extract-zip", files=files, timeout=60)
+        return r.ok and r.json().get("count") == len(self.usernames)
+
+    def op_check_sent(self):
+        r = self.http.post(f"{self.base}/api/pending-sent", json={"usernames": self.usernames}, timeout=30)
+        if not r.ok:
+            return False
+        with self.http.get(f"{self.base}/api/check-sent/{r.json()['task_id']}", stream=True, timeout=120) as s:
+            return s.ok and _read_stream(s)
+
+    def op_cancel(self):
+        ids = [_user_id(u) for u in self.usernames[:self.args.cancel_size]]
+        r = self.http.post(f"{self.base}/api/cancel", json={"user_ids": ids}, timeout=30)
+        if not r.ok:
+            return False
+        with self.http.get(f"{self.base}/api/progress/{r.json()['task_id']}", stream=True, timeout=120) as s:
+            return s.ok and _read_stream(s)
+
+    def op_list(self):
+        r = self.http.get(f"{self.base}/api/not-following-back", timeout=120)
+        if not r.ok:
+            return False
+        # A browser only loads avatars for the rows on screen
+        for user in r.json()["users"][:self.args.visible_rows]:
+            img = self.http.get(f"{self.base}/api/proxy-image", params={"url": user["profile_pic_url"]}, timeout=30)
+            if not img.ok:
+                return False
+        return True
+
+    def run(self):
+        if not self.timed("login", self.login):
+            return
+        ops, weights = zip(*self.mix.items())
+        while not self.stop.is_set():
+            op = random.choices(ops, weights)[0]
+            self.timed(op, getattr(self, f"op_{op}"))
+            self.stop.wait(random.uniform(0.5, 2.0))
+
+
+def probe(base, stats, stop):
+    """Cheap request on a fixed schedule: its latency is the queueing delay for a free thread slot."""
+    http = CountingSession(stats)
+    while not stop.is_set():
+        start = time.monotonic()
+        try:
+            ok = http.get(f"{base}/login", timeout=30).ok
+        except requests.RequestException:
+            ok = False
+        stats.samples.setdefault("probe", []).append(time.monotonic() - start)
+        if not ok:
+            stats.errors["probe"] = stats.errors.get("probe", 0) + 1
+        stop.wait(0.5)
+
+
+# ------------------------------------------------------------------
+# Reporting
+# ------------------------------------------------------------------
+
+def _pct(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+
+def run_level(accounts, args, mix, upstream_url):
+    with tempfile.TemporaryDirectory(prefix="instaclean-loadtest-") as tmp:
+        return _run_level(accounts, args, mix, upstream_url, os.path.join(tmp, "ledger.sqlite3"))
+
+
+def _run_level(accounts, args, mix, upstream_url, ledger_path):
+    proc, base, cmd = start_app(upstream_url, args.pacing, ledger_path)
+    workers, threads = thread_slots(cmd)
+    stats = Stats()
+    stop = threading.Event()
+    rss_peak = {}
+
+    sims = [Account(i, base, stats, stop, args, mix) for i in range(accounts)]
+    threading.Thread(target=probe, args=(base, stats, stop), daemon=True).start()
+    for sim in sims:
+        sim.start()
+
+    started = time.monotonic()
+    while time.monotonic() - started < args.duration:
+        for pid, mb in worker_rss(proc.pid).items():
+            rss_peak[pid] = max(rss_peak.get(pid, 0), mb)
+        stats.sample_in_flight()
+        time.sleep(1)
+    stop.set()
+    elapsed = time.monotonic() - started
+    for sim in sims:
+        sim.join(timeout=5)
+    stop_app(proc)
+
+    in_flight = stats.in_flight_samples
+    ops = {}
+    total_done = total_err = 0
+    for op, values in stats.samples.items():
+        errors = stats.errors.get(op, 0)
+        ops[op] = {
+            "count": len(values), "errors": errors,
+            "p50_ms": round(_pct(values, 50) * 1000), "p95_ms": round(_pct(values, 95) * 1000),
+            "p99_ms": round(_pct(values, 99) * 1000),
+        }
+        if op != "probe":
+            total_done += len(values)
+            total_err += errors
+
+    return {
+        "accounts": accounts,
+        "workers": workers,
+        "threads": threads,
+        "throughput_ops_s": round(total_done / elapsed, 2),
+        "error_rate": round(total_err / total_done, 4) if total_done else 0.0,
+        # Requests open against the app vs. workers*threads; above 1.0 requests were queueing
+        "max_requests_in_flight": stats.max_requests_in_flight,
+        "peak_slot_saturation": round(stats.max_requests_in_flight / (workers * threads), 2),
+        "mean_slot_saturation": round(sum(in_flight) / len(in_flight) / (workers * threads), 2) if in_flight else 0.0,
+        "worker_rss_mb": sorted(round(mb, 1) for mb in rss_peak.values()),
+        "ops": ops,
+    }
+
+
+def fell_over(result, args):
+    probe = result["ops"].get("probe", {})
+    return result["error_rate"] > args.max_error_rate or probe.get("p95_ms", 0) > args.probe_slo
+
+
+def print_level(result):
+    print(f"\n== {result['accounts']} accounts "
+          f"({result['workers']} workers x {result['threads']} threads) ==")
+    print(f"throughput {result['throughput_ops_s']} ops/s   error rate {result['error_rate']:.2%}   "
+          f"peak requests in flight {result['max_requests_in_flight']} "
+          f"(slot saturation peak {result['peak_slot_saturation']:.0%}, mean {result['mean_slot_saturation']:.0%})   "
+          f"worker RSS MB {result['worker_rss_mb']}")
+    print(f"{'op':<12}{'count':>7}{'errors':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for op, o in sorted(result["ops"].items()):
+        print(f"{op:<12}{o['count']:>7}{o['errors']:>8}{o['p50_ms']:>9}{o['p95_ms']:>9}{o['p99_ms']:>9}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test InstaClean under its Procfile gunicorn settings.")
+    parser.add_argument("--accounts", default="1,2,4,8,16",
+                        help="comma-separated concurrency levels to sweep (default: %(default)s)")
+    parser.add_argument("--duration", type=float, default=60, help="seconds per level")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="op weights (default: %(default)s)")
+    parser.add_argument("--pacing", choices=["real", "fast"], default="real",
+                        help="real keeps Config delays (threads held as in production); fast shrinks them")
+    parser.add_argument("--upstream-latency", type=float, default=0.05, help="fake Instagram latency, seconds")
+    parser.add_argument("--list-size", type=int, default=400, help="users per fake following/followers list")
+    parser.add_argument("--sent-size", type=int, default=20, help="usernames per export / check-sent run")
+    parser.add_argument("--cancel-size", type=int, default=5, help="user ids per batch cancel")
+    parser.add_argument("--visible-rows", type=int, default=20, help="avatars fetched per list render")
+    parser.add_argument("--probe-slo", type=float, default=1000, help="probe p95 (ms) above which a level fails")
+    parser.add_argument("--max-error-rate", type=float, default=0.01, help="error rate above which a level fails")
+    parser.add_argument("--json", metavar="PATH", help="also write results as JSON")
+    args = parser.parse_args(argv)
+
+    mix = {}
+    for part in args.mix.split(","):
+        op, _, weight = part.partition("=")
+        if not hasattr(Account, f"op_{op.strip()}"):
+            parser.error(f"unknown op in --mix: {op}")
+        mix[op.strip()] = float(weight or 1)
+
+    upstream = start_fake_upstream(args.upstream_latency, args.list_size)
+    upstream_url = f"http://127.0.0.1:{upstream.server_address[1]}"
+
+    results = []
+    breaking_point = None
+    for level in [int(n) for n in args.accounts.split(",")]:
+        result = run_level(level, args, mix, upstream_url)
+        results.append(result)
+        print_level(result)
+        if fell_over(result, args):
+            breaking_point = level
+            break
+
+    print()
+    if breaking_point:
+        print(f"Falls over at {breaking_point} concurrent accounts "
+              f"(error rate > {args.max_error_rate:.0%} or probe p95 > {args.probe_slo:.0f} ms).")
+    else:
+        print("Held up at every tested level.")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"results": results, "breaking_point": breaking_point}, f, indent=2)
+    upstream.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
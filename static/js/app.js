@@ -83,6 +83,7 @@ function switchTab(tab) {
     document.querySelectorAll('.panel').forEach(p => p.classList.remove('active'));
     document.getElementById(`tab-${tab}`).classList.add('active');
     document.getElementById(`panel-${tab}`).classList.add('active');
+    if (activeList()) activeList().schedule();
     updateActionBar();
 
     // Auto-fetch if not loaded yet
@@ -114,21 +115,8 @@ async function fetchPending() {
             return;
         }
 
-        if (data.count === 0) {
-            list.innerHTML = '<div class="empty-state"><i class="fas fa-check-circle"></i><p>No received follow requests!</p></div>';
-            updateBadge('pending-count', 0);
-            return;
-        }
-
-        currentUsers.pending = data.users;
-        renderUserList('pending-list', data.users, 'Decline');
-        updateBadge('pending-count', data.count);
-
-        if (data.count > 0) {
-            document.getElementById('auto-cancel-btn').style.display = 'inline-flex';
-            document.getElementById('pending-summary').style.display = 'flex';
-            document.getElementById('pending-total').textContent = data.count;
-        }
+        setPendingUsers(data.users);
+        watchPending(data.cursor, data.poll_after);
     } catch (e) {
         list.innerHTML = '<div class="empty-state"><i class="fas fa-exclamation-triangle"></i><p>Failed to fetch. Try again.</p></div>';
     } finally {
@@ -137,6 +125,92 @@ async function fetchPending() {
     }
 }
 
+function setPendingUsers(users) {
+    const list = virtualLists['pending-list'];
+    currentUsers.pending = users;
+    updateBadge('pending-count', users.length);
+
+    if (users.length === 0) {
+        if (list) list.destroy();
+        delete virtualLists['pending-list'];
+        document.getElementById('pending-list').innerHTML = '<div class="empty-state"><i class="fas fa-check-circle"></i><p>No received follow requests!</p></div>';
+        document.getElementById('auto-cancel-btn').style.display = 'none';
+        document.getElementById('pending-summary').style.display = 'none';
+        return;
+    }
+
+    if (list && list.el.isConnected) list.setItems(users);
+    else renderUserList('pending-list', users, 'Decline');
+    document.getElementById('auto-cancel-btn').style.display = 'inline-flex';
+    document.getElementById('pending-summary').style.display = 'flex';
+    document.getElementById('pending-total').textContent = users.length;
+}
+
+// Live updates: poll the server-side watcher for added users and removed ids
+// since our cursor. Polls are answered from memory and never hold a server
+// thread open between updates. The cursor is a hash of the list's ids, so
+// any worker holding the same list answers "no changes".
+let pendingCursor = null;
+let pendingPollTimer = null;
+let pendingUnwatched = 0;
+const PENDING_RESYNC_AFTER = 3;  // consecutive "unwatched" answers before reloading
+
+function watchPending(cursor, pollAfter) {
+    pendingCursor = cursor;
+    clearTimeout(pendingPollTimer);
+    pendingPollTimer = setTimeout(pollPendingChanges, (pollAfter || 60) * 1000);
+}
+
+async function pollPendingChanges() {
+    let msg;
+    try {
+        const resp = await fetch(`/api/pending-received/changes?cursor=${encodeURIComponent(pendingCursor)}`);
+        if (resp.status === 401) { window.location.href = '/login'; return; }
+        msg = await resp.json();
+    } catch (e) {
+        watchPending(pendingCursor);  // network blip: try again next interval
+        return;
+    }
+
+    if (msg.type === 'unwatched') {
+        // The worker that answered has no watcher; the other one usually does
+        if (++pendingUnwatched >= PENDING_RESYNC_AFTER) resyncPending();
+        else watchPending(pendingCursor, msg.poll_after);
+        return;
+    }
+    pendingUnwatched = 0;
+
+    if (msg.type === 'snapshot') {
+        setPendingUsers(msg.users);
+    } else if (msg.type === 'deltas' && msg.deltas.length > 0) {
+        let users = currentUsers.pending;
+        let added = 0;
+        msg.deltas.forEach(delta => {
+            const gone = new Set(delta.removed.concat(delta.added.map(u => u.user_id)).map(String));
+            users = delta.added.concat(users.filter(u => !gone.has(String(u.user_id))));
+            added += delta.added.length;
+        });
+        setPendingUsers(users);
+        if (added > 0) showToast(`${added} new follow request${added > 1 ? 's' : ''}`, 'success');
+    }
+    watchPending(msg.cursor, msg.poll_after);
+}
+
+// Quiet reload that (re)starts a watcher; the list is only re-rendered if it changed
+async function resyncPending() {
+    pendingUnwatched = 0;
+    try {
+        const resp = await fetch('/api/pending-received');
+        if (resp.status === 401) { window.location.href = '/login'; return; }
+        const data = await resp.json();
+        if (data.error) { watchPending(pendingCursor); return; }
+        if (data.cursor !== pendingCursor) setPendingUsers(data.users);
+        watchPending(data.cursor, data.poll_after);
+    } catch (e) {
+        watchPending(pendingCursor);
+    }
+}
+
 function autoCancelAll() {
     const users = currentUsers.pending;
     if (!users || users.length === 0) {
@@ -183,8 +257,7 @@ function autoCancelAll() {
                 document.getElementById('progress-failed').textContent = msg.failed;
                 const username = usernameMap[msg.user_id] || msg.user_id;
                 addLogEntry(`@${username}`, msg.result_status === 'cancelled' ? 'Declined' : msg.result_status, msg.result_status === 'cancelled' ? 'success' : 'fail');
-                const row = document.querySelector(`#pending-list [data-user-id="${msg.user_id}"]`);
-                if (row) row.classList.add('completed');
+                markCompletedEverywhere(msg.user_id);
             }
             if (msg.type === 'complete') {
                 es.close();
@@ -338,6 +411,20 @@ async function handleSentZip(input) {
     }
 }
 
+// Settled accounts from earlier runs are skipped unless the re-check box is ticked
+function pendingSentUrl() {
+    const includeSettled = document.getElementById('sent-include-settled')?.checked;
+    return includeSettled ? '/api/pending-sent?include_settled=1' : '/api/pending-sent';
+}
+
+// Everything was skipped as settled: offer to re-check them. Returns true if the caller should retry.
+function offerRecheckSettled(data) {
+    if (!(data.skipped > 0) || document.getElementById('sent-include-settled').checked) return false;
+    if (!confirm(`All ${data.skipped} usernames were already settled in earlier runs.\n\nRe-check them anyway?`)) return false;
+    document.getElementById('sent-include-settled').checked = true;
+    return true;
+}
+
 async function fetchSentRequests() {
     const btn = document.getElementById('fetch-sent-btn');
     const list = document.getElementById('sent-list');
@@ -368,27 +455,33 @@ async function fetchSentRequests() {
     btn.disabled = true;
     btn.innerHTML = '<i class="fas fa-spinner fa-spin"></i> Checking...';
     list.innerHTML = '';
+    if (virtualLists['sent-list']) virtualLists['sent-list'].destroy();
+    delete virtualLists['sent-list'];
     allSentUsers = [];
     document.getElementById('auto-cancel-sent-btn').style.display = 'none';
     document.getElementById('sent-filter-bar').style.display = 'none';
 
     try {
         // Step 1: Upload file and get task_id
-        const resp = await fetch('/api/pending-sent', { method: 'POST', body: formData });
+        const resp = await fetch(pendingSentUrl(), { method: 'POST', body: formData });
         if (resp.status === 401) { window.location.href = '/login'; return; }
         const data = await resp.json();
 
         if (data.error) {
-            list.innerHTML = `<div class="empty-state"><i class="fas fa-exclamation-triangle"></i><p>${data.error}</p></div>`;
-            showToast(data.error, 'error');
             btn.disabled = false;
             btn.innerHTML = '<i class="fas fa-search"></i> Check Requests';
+            if (offerRecheckSettled(data)) return fetchSentRequests();
+            list.innerHTML = `<div class="empty-state"><i class="fas fa-exclamation-triangle"></i><p>${data.error}</p></div>`;
+            showToast(data.error, 'error');
             return;
         }
 
+        if (data.skipped > 0) showToast(`Skipped ${data.skipped} already settled in earlier runs`, 'success');
+
         // Step 2: Stream results via SSE
         const total = data.total;
         list.innerHTML = `<div class="sent-progress-header"><span id="sent-checking-text">Checking 0 / ${total}...</span></div>`;
+        const sentList = mountVirtualList('sent-list', userRowRenderer('Cancel', true), STATUS_ROW_HEIGHT);
 
         const es = new EventSource(`/api/check-sent/${data.task_id}`);
 
@@ -428,6 +521,7 @@ async function fetchSentRequests() {
                 // Remove progress header
                 const header = document.querySelector('.sent-progress-header');
                 if (header) header.remove();
+                sentList.schedule();
 
                 currentUsers.sent = allSentUsers.filter(u => u.user_id);
                 showToast(`Done! ${allSentUsers.length} checked (${counts.pending} pending)`, 'success');
@@ -441,37 +535,8 @@ async function fetchSentRequests() {
             const progText = document.getElementById('sent-checking-text');
             if (progText) progText.textContent = `Checking ${msg.index + 1} / ${msg.total}...`;
 
-            // Append user row to list
-            const statusClass = msg.status === 'pending' ? 'status-pending' :
-                               msg.status === 'accepted' ? 'status-accepted' :
-                               msg.status === 'not_found' ? 'status-not-found' : 'status-not-pending';
-            const statusText = msg.status === 'pending' ? 'Pending' :
-                              msg.status === 'accepted' ? 'Accepted' :
-                              msg.status === 'not_found' ? 'Not Found' : 'Not Pending';
-            const hasId = msg.user_id != null;
-
-            const dateStr = msg.request_date || '';
-
-            const row = document.createElement('div');
-            row.className = 'user-row';
-            row.setAttribute('data-user-id', msg.user_id || '');
-            row.setAttribute('data-status', msg.status);
-            row.innerHTML = `
-                <input type="checkbox" class="user-checkbox" value="${msg.user_id || ''}" onchange="updateActionBar()" ${hasId ? '' : 'disabled'}>
-                <img src="${proxyImg(msg.profile_pic_url)}" class="avatar" onerror="this.src='/static/img/default-avatar.svg'" loading="lazy">
-                <div class="user-info">
-                    <span>
-                        <a href="https://www.instagram.com/${msg.username}" target="_blank" rel="noopener" class="username-link">@${msg.username}</a>
-                        ${msg.is_verified ? '<i class="fas fa-check-circle verified"></i>' : ''}
-                        ${msg.is_private ? '<i class="fas fa-lock private"></i>' : ''}
-                    </span>
-                    ${msg.full_name ? `<span class="fullname">${msg.full_name}</span>` : ''}
-                    ${dateStr ? `<span class="request-date"><i class="far fa-clock"></i> ${dateStr}</span>` : ''}
-                </div>
-                <span class="status-badge ${statusClass}">${statusText}</span>
-                ${hasId ? `<button class="btn btn-ghost btn-sm" onclick="cancelSingle(${msg.user_id}, '${msg.username}', this)">Cancel</button>` : ''}
-            `;
-            list.appendChild(row);
+            // Append to the model; the list renders it on the next frame
+            sentList.append(msg);
         };
 
         es.onerror = function () {
@@ -527,7 +592,7 @@ function autoCancelSent() {
     fetch('/api/cancel', {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ user_ids: userIds }),
+        body: JSON.stringify({ user_ids: userIds, source: 'sent' }),
     })
     .then(r => r.json())
     .then(data => {
@@ -544,8 +609,7 @@ function autoCancelSent() {
                 document.getElementById('progress-failed').textContent = msg.failed;
                 const username = usernameMap[msg.user_id] || msg.user_id;
                 addLogEntry(`@${username}`, msg.result_status === 'cancelled' ? 'Cancelled' : msg.result_status, msg.result_status === 'cancelled' ? 'success' : 'fail');
-                const row = document.querySelector(`#sent-list [data-user-id="${msg.user_id}"]`);
-                if (row) row.classList.add('completed');
+                markCompletedEverywhere(msg.user_id);
             }
             if (msg.type === 'complete') {
                 es.close();
@@ -592,19 +656,21 @@ async function cancelAllSentDirect() {
     btn.innerHTML = '<i class="fas fa-spinner fa-spin"></i> Starting...';
 
     try {
-        const resp = await fetch('/api/pending-sent', { method: 'POST', body: formData });
+        const resp = await fetch(pendingSentUrl(), { method: 'POST', body: formData });
         if (resp.status === 401) { window.location.href = '/login'; return; }
         const data = await resp.json();
 
         if (data.error) {
-            showToast(data.error, 'error');
             btn.disabled = false;
             btn.innerHTML = '<i class="fas fa-bolt"></i> Cancel All Directly';
+            if (offerRecheckSettled(data)) return cancelAllSentDirect();
+            showToast(data.error, 'error');
             return;
         }
 
         const total = data.total;
-        if (!confirm(`Cancel ALL ${total} sent follow requests directly?\n\nThis will resolve each username and cancel immediately.\nEstimated time: ~${Math.ceil(total * 8 / 60)} minutes.`)) {
+        const skippedNote = data.skipped > 0 ? `\n${data.skipped} already settled in earlier runs will be skipped.` : '';
+        if (!confirm(`Cancel ALL ${total} sent follow requests directly?\n\nThis will resolve each username and cancel immediately.${skippedNote}\nEstimated time: ~${Math.ceil(total * 8 / 60)} minutes.`)) {
             btn.disabled = false;
             btn.innerHTML = '<i class="fas fa-bolt"></i> Cancel All Directly';
             return;
@@ -769,8 +835,7 @@ function autoUnfollowAll() {
                 const statusText = msg.result_status === 'cancelled' ? 'Unfollowed' : msg.result_status;
                 addLogEntry(`@${username}`, statusText, status);
 
-                const row = document.querySelector(`#nfb-list [data-user-id="${msg.user_id}"]`);
-                if (row) row.classList.add('completed');
+                markCompletedEverywhere(msg.user_id);
             }
 
             if (msg.type === 'complete') {
@@ -797,23 +862,185 @@ function autoUnfollowAll() {
 }
 
 // ============================================================
-// Render User List
+// Virtualized User List
 // ============================================================
+// Only rows inside (or near) the viewport exist in the DOM, so avatar
+// requests go out for visible rows only. Selection and completion state
+// live on the list model rather than in checkboxes that may be recycled.
+
+const ROW_GAP = 8;          // matches .user-list gap (0.5rem)
+const PLAIN_ROW_HEIGHT = 66;
+const STATUS_ROW_HEIGHT = 84;  // room for the request-date line
+const ROW_OVERSCAN = 6;     // extra rows rendered above/below the viewport
+const virtualLists = {};
+
+class VirtualList {
+    constructor(container, renderRow, rowHeight) {
+        this.container = container;
+        this.renderRow = renderRow;
+        this.rowHeight = rowHeight;
+        this.stride = rowHeight + ROW_GAP;
+        this.items = [];
+        this.indexById = new Map();
+        this.selected = new Set();
+        this.completed = new Set();
+        this.rows = new Map();   // index -> rendered element
+        this.frame = null;
+
+        this.el = document.createElement('div');
+        this.el.className = 'virtual-list';
+        container.appendChild(this.el);
+    }
 
-function renderUserList(containerId, users, actionLabel) {
-    const container = document.getElementById(containerId);
+    setItems(items) {
+        this.items = items;
+        this.indexById = new Map();
+        items.forEach((u, i) => { if (u.user_id != null) this.indexById.set(String(u.user_id), i); });
+        this.selected = new Set([...this.selected].filter(id => this.indexById.has(id)));
+        this.clearRows();
+        this.schedule();
+    }
 
-    if (users.length === 0) {
-        container.innerHTML = '<div class="empty-state"><i class="fas fa-check-circle"></i><p>No users found. You\'re all clean!</p></div>';
-        return;
+    append(item) {
+        if (item.user_id != null) this.indexById.set(String(item.user_id), this.items.length);
+        this.items.push(item);
+        this.schedule();
+    }
+
+    isSelected(userId) { return this.selected.has(String(userId)); }
+    isCompleted(userId) { return this.completed.has(String(userId)); }
+
+    selectableIds() {
+        return this.items.filter(u => u.user_id != null).map(u => String(u.user_id));
+    }
+
+    setSelected(userId, checked) {
+        if (checked) this.selected.add(String(userId));
+        else this.selected.delete(String(userId));
+    }
+
+    selectAll(checked) {
+        this.selected = new Set(checked ? this.selectableIds() : []);
+        this.clearRows();
+        this.schedule();
     }
 
-    container.innerHTML = users.map((user, i) => `
-        <div class="user-row" data-user-id="${user.user_id}" data-index="${i}">
-            <input type="checkbox" class="user-checkbox" value="${user.user_id}"
-                   onchange="updateActionBar()">
+    markCompleted(userId) {
+        const key = String(userId);
+        this.completed.add(key);
+        const index = this.indexById.get(key);
+        if (index !== undefined && this.rows.has(index)) {
+            this.rows.get(index).remove();
+            this.rows.delete(index);
+            this.schedule();
+        }
+    }
+
+    clearRows() {
+        this.rows.forEach(row => row.remove());
+        this.rows.clear();
+    }
+
+    schedule() {
+        if (this.frame !== null) return;
+        this.frame = requestAnimationFrame(() => {
+            this.frame = null;
+            this.render();
+        });
+    }
+
+    render() {
+        const count = this.items.length;
+        this.el.style.height = count > 0 ? (count * this.stride - ROW_GAP) + 'px' : '0';
+
+        const top = this.el.getBoundingClientRect().top;
+        const viewTop = Math.max(0, -top);
+        const viewBottom = Math.max(0, window.innerHeight - top);
+        const first = Math.max(0, Math.floor(viewTop / this.stride) - ROW_OVERSCAN);
+        const last = Math.min(count - 1, Math.ceil(viewBottom / this.stride) + ROW_OVERSCAN);
+
+        this.rows.forEach((row, i) => {
+            if (i < first || i > last) {
+                row.remove();
+                this.rows.delete(i);
+            }
+        });
+
+        const fragment = document.createDocumentFragment();
+        for (let i = first; i <= last; i++) {
+            if (this.rows.has(i)) continue;
+            const row = this.renderRow(this.items[i], i, this);
+            row.style.top = (i * this.stride) + 'px';
+            row.style.height = this.rowHeight + 'px';
+            this.rows.set(i, row);
+            fragment.appendChild(row);
+        }
+        this.el.appendChild(fragment);
+    }
+
+    destroy() {
+        if (this.frame !== null) cancelAnimationFrame(this.frame);
+        this.el.remove();
+    }
+}
+
+function mountVirtualList(containerId, renderRow, rowHeight) {
+    if (virtualLists[containerId]) virtualLists[containerId].destroy();
+    const list = new VirtualList(document.getElementById(containerId), renderRow, rowHeight);
+    virtualLists[containerId] = list;
+    return list;
+}
+
+function activeList() {
+    return virtualLists[`${currentTab}-list`];
+}
+
+function markCompletedEverywhere(userId) {
+    Object.values(virtualLists).forEach(list => list.markCompleted(userId));
+}
+
+function onRowCheckbox(containerId, checkbox) {
+    virtualLists[containerId].setSelected(checkbox.value, checkbox.checked);
+    updateActionBar();
+}
+
+window.addEventListener('scroll', () => Object.values(virtualLists).forEach(l => l.schedule()), { passive: true });
+window.addEventListener('resize', () => Object.values(virtualLists).forEach(l => l.schedule()));
+
+// ============================================================
+// Render User List
+// ============================================================
+
+function statusInfo(status) {
+    if (status === 'pending') return ['status-pending', 'Pending'];
+    if (status === 'accepted') return ['status-accepted', 'Accepted'];
+    if (status === 'not_found') return ['status-not-found', 'Not Found'];
+    return ['status-not-pending', 'Not Pending'];
+}
+
+function userRowRenderer(actionLabel, withStatus) {
+    return function (user, i, list) {
+        const hasId = user.user_id != null;
+        const done = hasId && list.isCompleted(user.user_id);
+        const containerId = list.container.id;
+        const dateStr = withStatus ? (user.request_date || '') : '';
+        const [statusClass, statusText] = statusInfo(user.status);
+
+        const row = document.createElement('div');
+        row.className = done ? 'user-row completed' : 'user-row';
+        row.setAttribute('data-user-id', hasId ? user.user_id : '');
+        row.setAttribute('data-index', i);
+        if (withStatus) row.setAttribute('data-status', user.status);
+
+        const button = !hasId ? '' : done
+            ? '<button class="btn btn-ghost btn-sm" style="color:var(--success)" disabled><i class="fas fa-check"></i> Done</button>'
+            : `<button class="btn btn-ghost btn-sm" onclick="cancelSingle(${user.user_id}, '${user.username}', this)">${actionLabel}</button>`;
+
+        row.innerHTML = `
+            <input type="checkbox" class="user-checkbox" value="${hasId ? user.user_id : ''}"
+                   onchange="onRowCheckbox('${containerId}', this)" ${hasId ? '' : 'disabled'} ${hasId && list.isSelected(user.user_id) ? 'checked' : ''}>
             <img src="${proxyImg(user.profile_pic_url)}" class="avatar"
-                 onerror="this.src='/static/img/default-avatar.svg'" loading="lazy">
+                 onerror="this.src='/static/img/default-avatar.svg'">
             <div class="user-info">
                 <span>
                     <a href="https://www.instagram.com/${user.username}" target="_blank" rel="noopener" class="username-link">@${user.username}</a>
@@ -821,52 +1048,48 @@ function renderUserList(containerId, users, actionLabel) {
                     ${user.is_private ? '<i class="fas fa-lock private"></i>' : ''}
                 </span>
                 ${user.full_name ? `<span class="fullname">${user.full_name}</span>` : ''}
+                ${dateStr ? `<span class="request-date"><i class="far fa-clock"></i> ${dateStr}</span>` : ''}
             </div>
-            <button class="btn btn-ghost btn-sm" onclick="cancelSingle(${user.user_id}, '${user.username}', this)">
-                ${actionLabel}
-            </button>
-        </div>
-    `).join('');
+            ${withStatus ? `<span class="status-badge ${statusClass}">${statusText}</span>` : ''}
+            ${button}
+        `;
+        return row;
+    };
+}
+
+function renderUserList(containerId, users, actionLabel) {
+    const container = document.getElementById(containerId);
+
+    if (users.length === 0) {
+        if (virtualLists[containerId]) virtualLists[containerId].destroy();
+        delete virtualLists[containerId];
+        container.innerHTML = '<div class="empty-state"><i class="fas fa-check-circle"></i><p>No users found. You\'re all clean!</p></div>';
+        return;
+    }
+
+    container.innerHTML = '';
+    mountVirtualList(containerId, userRowRenderer(actionLabel, false), PLAIN_ROW_HEIGHT).setItems(users);
 }
 
 function renderUserListWithStatus(containerId, users, actionLabel) {
     const container = document.getElementById(containerId);
+    const existing = virtualLists[containerId];
 
     if (users.length === 0) {
+        if (existing) existing.destroy();
+        delete virtualLists[containerId];
         container.innerHTML = '<div class="empty-state"><i class="fas fa-check-circle"></i><p>No users found.</p></div>';
         return;
     }
 
-    container.innerHTML = users.map((user, i) => {
-        const statusClass = user.status === 'pending' ? 'status-pending' :
-                           user.status === 'accepted' ? 'status-accepted' :
-                           user.status === 'not_found' ? 'status-not-found' : 'status-not-pending';
-        const statusText = user.status === 'pending' ? 'Pending' :
-                          user.status === 'accepted' ? 'Accepted' :
-                          user.status === 'not_found' ? 'Not Found' : 'Not Pending';
-        const hasId = user.user_id != null;
-        const disabled = !hasId ? 'disabled' : '';
+    // Re-filtering an existing list only swaps the model; completion state is kept
+    if (existing && existing.el.isConnected && existing.rowHeight === STATUS_ROW_HEIGHT) {
+        existing.setItems(users);
+        return;
+    }
 
-        const dateStr = user.request_date || '';
-        return `
-        <div class="user-row" data-user-id="${user.user_id || ''}" data-index="${i}">
-            <input type="checkbox" class="user-checkbox" value="${user.user_id || ''}"
-                   onchange="updateActionBar()" ${disabled}>
-            <img src="${proxyImg(user.profile_pic_url)}" class="avatar"
-                 onerror="this.src='/static/img/default-avatar.svg'" loading="lazy">
-            <div class="user-info">
-                <span>
-                    <a href="https://www.instagram.com/${user.username}" target="_blank" rel="noopener" class="username-link">@${user.username}</a>
-                    ${user.is_verified ? '<i class="fas fa-check-circle verified"></i>' : ''}
-                    ${user.is_private ? '<i class="fas fa-lock private"></i>' : ''}
-                </span>
-                ${user.full_name ? `<span class="fullname">${user.full_name}</span>` : ''}
-                ${dateStr ? `<span class="request-date"><i class="far fa-clock"></i> ${dateStr}</span>` : ''}
-            </div>
-            <span class="status-badge ${statusClass}">${statusText}</span>
-            ${hasId ? `<button class="btn btn-ghost btn-sm" onclick="cancelSingle(${user.user_id}, '${user.username}', this)">${actionLabel}</button>` : ''}
-        </div>`;
-    }).join('');
+    container.innerHTML = '';
+    mountVirtualList(containerId, userRowRenderer(actionLabel, true), STATUS_ROW_HEIGHT).setItems(users);
 }
 
 // ============================================================
@@ -874,30 +1097,32 @@ function renderUserListWithStatus(containerId, users, actionLabel) {
 // ============================================================
 
 function updateActionBar() {
-    const checkboxes = document.querySelectorAll(`#panel-${currentTab} .user-checkbox:not(:disabled)`);
-    const checked = document.querySelectorAll(`#panel-${currentTab} .user-checkbox:checked`);
+    const list = activeList();
+    const selectable = list ? list.selectableIds().length : 0;
+    const checked = list ? list.selected.size : 0;
     const bar = document.getElementById('action-bar');
     const countEl = document.getElementById('selected-count');
     const actionText = document.getElementById('batch-action-text');
 
-    if (checked.length > 0) {
+    if (checked > 0) {
         bar.style.display = 'flex';
-        countEl.textContent = checked.length;
+        countEl.textContent = checked;
         actionText.textContent = currentTab === 'nfb'
-            ? `Unfollow Selected (${checked.length})`
-            : `Cancel Selected (${checked.length})`;
+            ? `Unfollow Selected (${checked})`
+            : `Cancel Selected (${checked})`;
     } else {
         bar.style.display = 'none';
     }
 
-    allSelected = checked.length === checkboxes.length && checkboxes.length > 0;
+    allSelected = checked === selectable && selectable > 0;
     document.getElementById('select-all-text').textContent = allSelected ? 'Deselect All' : 'Select All';
 }
 
 function toggleSelectAll() {
-    const checkboxes = document.querySelectorAll(`#panel-${currentTab} .user-checkbox:not(:disabled)`);
+    const list = activeList();
+    if (!list) return;
     allSelected = !allSelected;
-    checkboxes.forEach(cb => cb.checked = allSelected);
+    list.selectAll(allSelected);
     updateActionBar();
 }
 
@@ -914,7 +1139,7 @@ async function cancelSingle(userId, username, btn) {
         const resp = await fetch(endpoint, {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ user_ids: [userId] }),
+            body: JSON.stringify({ user_ids: [userId], source: currentTab }),
         });
         const data = await resp.json();
 
@@ -930,12 +1155,7 @@ async function cancelSingle(userId, username, btn) {
             const msg = JSON.parse(event.data);
             if (msg.type === 'complete' || msg.type === 'progress') {
                 es.close();
-                const row = document.querySelector(`[data-user-id="${userId}"]`);
-                if (row) {
-                    row.classList.add('completed');
-                    btn.innerHTML = '<i class="fas fa-check"></i> Done';
-                    btn.style.color = 'var(--success)';
-                }
+                markCompletedEverywhere(userId);
                 showToast(`@${username} — done`, 'success');
             }
         };
@@ -956,8 +1176,8 @@ async function cancelSingle(userId, username, btn) {
 // ============================================================
 
 function startBatchAction() {
-    const checked = document.querySelectorAll(`#panel-${currentTab} .user-checkbox:checked`);
-    const userIds = Array.from(checked).map(cb => parseInt(cb.value)).filter(id => !isNaN(id));
+    const list = activeList();
+    const userIds = (list ? Array.from(list.selected) : []).map(id => parseInt(id)).filter(id => !isNaN(id));
 
     if (userIds.length === 0) {
         showToast('No users selected', 'error');
@@ -984,7 +1204,7 @@ function startBatchAction() {
     fetch(endpoint, {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ user_ids: userIds }),
+        body: JSON.stringify({ user_ids: userIds, source: currentTab }),
     })
     .then(r => r.json())
     .then(data => {
@@ -1012,8 +1232,7 @@ function startBatchAction() {
                 const statusText = msg.result_status === 'cancelled' ? 'Done' : msg.result_status;
                 addLogEntry(`@${username}`, statusText, status);
 
-                const row = document.querySelector(`[data-user-id="${msg.user_id}"]`);
-                if (row) row.classList.add('completed');
+                markCompletedEverywhere(msg.user_id);
             }
 
             if (msg.type === 'complete') {
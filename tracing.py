@@ -0,0 +1,105 @@
+"""
+Per-Task Execution Tracing
+--------------------------
+Records spans (upstream calls, pacing/backoff waits, SSE flushes) into a
+bounded ring buffer and exports them as Chrome trace-event JSON, which
+Perfetto and chrome://tracing can open. Tasks that aren't traced get
+NULL_TRACER, whose methods do nothing.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+
+from config import Config
+
+
+class Tracer:
+    """Ring buffer of complete ("X") and instant ("i") trace events."""
+
+    def __init__(self, name, capacity=None):
+        self.name = name
+        self.events = deque(maxlen=capacity or Config.TRACE_BUFFER_SIZE)
+        self.pid = os.getpid()
+        self.origin = time.perf_counter()
+        self.dropped = 0
+        self._local = threading.local()
+
+    def set_context(self, **tags):
+        """Tags (e.g. username, user_id) added to every event recorded by this thread."""
+        self._local.tags = tags
+
+    def _args(self, args):
+        tags = getattr(self._local, "tags", None)
+        return {**tags, **args} if tags else args
+
+    def _append(self, event):
+        if len(self.events) == self.events.maxlen:
+            self.dropped += 1
+        self.events.append(event)
+
+    def add(self, name, cat, start, end, args=None):
+        """Record a span from perf_counter() timestamps."""
+        self._append({
+            "name": name, "cat": cat, "ph": "X",
+            "ts": round((start - self.origin) * 1e6), "dur": round((end - start) * 1e6),
+            "pid": self.pid, "tid": threading.get_ident(),
+            "args": self._args(args or {}),
+        })
+
+    def instant(self, name, cat, **args):
+        self._append({
+            "name": name, "cat": cat, "ph": "i", "s": "t",
+            "ts": round((time.perf_counter() - self.origin) * 1e6),
+            "pid": self.pid, "tid": threading.get_ident(),
+            "args": self._args(args),
+        })
+
+    @contextmanager
+    def span(self, name, cat, **args):
+        """Time the with-block. args may be updated inside the block (e.g. with a status code)."""
+        start = time.perf_counter()
+        try:
+            yield args
+        finally:
+            self.add(name, cat, start, time.perf_counter(), args)
+
+    def sleep(self, seconds, reason):
+        with self.span(reason, "wait", seconds=round(seconds, 3)):
+            time.sleep(seconds)
+
+    def chrome_trace(self):
+        events = list(self.events)
+        threads = {e["tid"] for e in events}
+        meta = [{"name": "process_name", "ph": "M", "pid": self.pid, "args": {"name": self.name}}]
+        meta += [{"name": "thread_name", "ph": "M", "pid": self.pid, "tid": tid,
+                  "args": {"name": f"thread-{i}"}} for i, tid in enumerate(sorted(threads))]
+        return {
+            "traceEvents": meta + events,
+            "displayTimeUnit": "ms",
+            "otherData": {"task": self.name, "dropped_events": self.dropped},
+        }
+
+
+class NullTracer:
+    """Stand-in for untraced tasks; every call is a no-op."""
+
+    def set_context(self, **tags):
+        pass
+
+    def add(self, name, cat, start, end, args=None):
+        pass
+
+    def instant(self, name, cat, **args):
+        pass
+
+    def span(self, name, cat, **args):
+        return nullcontext(args)
+
+    def sleep(self, seconds, reason):
+        time.sleep(seconds)
+
+
+NULL_TRACER = NullTracer()
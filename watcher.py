@@ -0,0 +1,184 @@
+"""
+Incoming Request Watcher
+------------------------
+One background thread per account keeps a materialized copy of the
+incoming follow-request list. The watcher is seeded with the list that
+/api/pending-received just fetched, so starting one costs no extra
+upstream calls. Polls are cheap: newest-first pages are read only until a
+page contains an id we already know, and every WATCH_FULL_SYNC_EVERY
+polls the whole list is re-read to catch removals deeper down.
+
+Changes are kept in a short log. Clients poll for them with a cursor
+instead of holding a stream open, so watching never ties up one of the
+gunicorn request threads. The cursor is a hash of the ordered id list, so
+any worker whose watcher holds the same list answers "no changes" even
+though watchers are per process; only a cursor for a list this watcher
+can't reach through its log gets a full snapshot.
+"""
+
+import hashlib
+import threading
+import time
+from collections import deque
+
+from config import Config
+from instagram_api import InstagramAPI, RateLimitError, AuthenticationError
+
+# account (ds_user_id) -> PendingWatcher, per process
+watchers = {}
+_watchers_lock = threading.Lock()
+
+
+def list_cursor(users):
+    """Content cursor for a user list: a short hash of its ordered ids."""
+    h = hashlib.sha1()
+    for user in users:
+        h.update(f"{user['user_id']},".encode())
+    return h.hexdigest()[:16]
+
+
+def get_watcher(account):
+    """The running watcher for account, or None."""
+    watcher = watchers.get(account)
+    if watcher is None or not watcher.is_alive():
+        return None
+    return watcher
+
+
+def start_watcher(account, cookies, users):
+    """Return the running watcher for account, starting one seeded with users if needed."""
+    with _watchers_lock:
+        watcher = get_watcher(account)
+        if watcher is None:
+            watcher = PendingWatcher(account, cookies, users)
+            watchers[account] = watcher
+            watcher.start()
+        return watcher
+
+
+class PendingWatcher(threading.Thread):
+
+    def __init__(self, account, cookies, users):
+        super().__init__(daemon=True)
+        self.account = account
+        self.api = InstagramAPI(cookies["session_id"], cookies["ds_user_id"], cookies["csrf_token"])
+        self.lock = threading.Lock()
+        self.users = list(users)
+        self.synced_at = time.time()
+        self.polls = 0
+        self.interval = Config.WATCH_POLL_INTERVAL
+        self.cursor = list_cursor(self.users)
+        self.log = deque(maxlen=Config.WATCH_LOG_SIZE)  # (cursor before, added, removed)
+        self.last_seen = time.monotonic()
+        self.wake = threading.Event()
+
+    # ------------------------------------------------------------------
+    # Client reads
+    # ------------------------------------------------------------------
+
+    def snapshot(self):
+        """(users, cursor) for the current list."""
+        with self.lock:
+            self.last_seen = time.monotonic()
+            return list(self.users), self.cursor
+
+    def changes_since(self, cursor):
+        """
+        Deltas that turn the list identified by cursor into the current one,
+        oldest first, or a full snapshot when the log doesn't reach back to it.
+        """
+        with self.lock:
+            self.last_seen = time.monotonic()
+            if cursor == self.cursor:
+                return {"type": "deltas", "deltas": [], "count": len(self.users), "cursor": self.cursor}
+            entries = list(self.log)
+            # Latest match: a list can return to an earlier state
+            for i in range(len(entries) - 1, -1, -1):
+                if entries[i][0] == cursor:
+                    deltas = [{"added": added, "removed": removed} for _, added, removed in entries[i:]]
+                    return {"type": "deltas", "deltas": deltas,
+                            "count": len(self.users), "cursor": self.cursor}
+            return {"type": "snapshot", "users": list(self.users),
+                    "count": len(self.users), "cursor": self.cursor}
+
+    # ------------------------------------------------------------------
+    # Polling
+    # ------------------------------------------------------------------
+
+    def run(self):
+        while True:
+            # Seeded with a fresh list, so the first poll waits an interval too
+            self.wake.wait(self.interval)
+            self.wake.clear()
+            with self.lock:
+                idle = time.monotonic() - self.last_seen > Config.WATCH_IDLE_TIMEOUT
+            if idle:
+                break
+            try:
+                self.poll()
+                self.interval = Config.WATCH_POLL_INTERVAL
+            except RateLimitError:
+                self.interval = min(self.interval * 2, Config.WATCH_MAX_BACKOFF)
+            except AuthenticationError:
+                break
+            except Exception:
+                pass
+
+        with _watchers_lock:
+            if watchers.get(self.account) is self:
+                del watchers[self.account]
+
+    def poll(self):
+        """
+        Refresh the list. Any upstream error propagates before self.users
+        is touched, so a failed page never replaces the list with a
+        partial one.
+        """
+        self.polls += 1
+        with self.lock:
+            known = {u["user_id"]: i for i, u in enumerate(self.users)}
+            old = list(self.users)
+
+        if self.polls % Config.WATCH_FULL_SYNC_EVERY == 0:
+            fresh = self.api.get_incoming_pending_requests()
+        else:
+            fresh = self._incremental(old, known)
+
+        added = [u for u in fresh if u["user_id"] not in known]
+        fresh_ids = {u["user_id"] for u in fresh}
+        removed = [u["user_id"] for u in old if u["user_id"] not in fresh_ids]
+
+        with self.lock:
+            self.users = fresh
+            self.synced_at = time.time()
+            cursor = list_cursor(fresh)
+            if cursor != self.cursor:
+                # Logged even for a pure reorder so the chain of cursors stays unbroken
+                self.log.append((self.cursor, added, removed))
+                self.cursor = cursor
+
+    def _incremental(self, old, known):
+        """
+        Read newest-first pages until one contains a known id. Everything
+        up to the deepest known id seen is replaced by what was fetched;
+        the rest of the old list is kept as-is.
+        """
+        window = []
+        max_id = None
+        for page_number in range(Config.WATCH_MAX_PAGES):
+            if page_number:
+                time.sleep(Config.FETCH_PAGE_DELAY)
+            page, max_id = self.api.get_incoming_pending_page(max_id)
+            window.extend(page)
+            if not max_id:
+                return window  # read the whole list
+            if any(u["user_id"] in known for u in page):
+                break
+        else:
+            # Too many new requests to catch up cheaply
+            return self.api.get_incoming_pending_requests()
+
+        boundary = max((known[u["user_id"]] for u in window if u["user_id"] in known), default=-1)
+        window_ids = {u["user_id"] for u in window}
+        tail = [u for u in old[boundary + 1:] if u["user_id"] not in window_ids]
+        return window + tail